@@ -1,14 +1,93 @@
 import streamlit as st
-import altair as alt
-import pandas as pd
+import os
 import time
+import uuid
 from translations import translations
-from core import (
-    validate_input,
-    generate_random_phrase,
-    reproduce,
-    select_best
-)
+from core import validate_input
+from export import default_format
+from cache import RunCache, run_key
+from checkpoint import checkpoint_path
+from predictor import MAX_EXPECTED, predict
+from profiler import NullProfiler, PhaseProfiler
+from render import HighlightRenderer
+from scheduler import JobScheduler, QuotaExceeded
+from telemetry import ChartWindow
+from worker import ReplayWorker
+
+MAX_PREDICTION_LENGTH = 1000
+REFRESH_HZ = 10
+MAX_CHART_POINTS = 300
+CHART_TAIL_POINTS = 100
+HISTORY_SIZE = 15
+PROFILE_PANEL_INTERVAL = 1.0
+CHECKPOINT_EVERY = 10
+STATE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'weasel', 'checkpoints')
+STATE_INTERVAL = 30.0
+EXPORT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'weasel', 'exports')
+EXPORT_MAX_AGE = 24 * 3600
+MAX_WORKERS = os.cpu_count()
+SESSION_QUOTA = 2
+MAX_JOB_GENERATIONS = 1000000
+
+
+@st.cache_data
+def cached_prediction(length, mutation_rate, population_size):
+    prediction = predict(length, mutation_rate, population_size)
+    if not prediction.converges:
+        return None
+    return prediction.expected, prediction.std, prediction.quantile(0.1), prediction.quantile(0.9)
+
+
+@st.cache_resource
+def get_run_cache():
+    return RunCache()
+
+
+@st.cache_resource
+def get_translations(lang):
+    return translations[lang]
+
+
+@st.cache_resource
+def chart_spec():
+    return {
+        'mark': {'type': 'line'},
+        'encoding': {
+            'x': {'field': 'generation', 'type': 'quantitative', 'title': 'Geração'},
+            'y': {'field': 'accuracy', 'type': 'quantitative', 'title': 'Precisão (%)'},
+        },
+        'height': 250,
+    }
+
+
+def chart_frame(generations, accuracy):
+    # pandas is only needed once a run is on screen, so keep it off the idle page's import path
+    import pandas as pd
+    return pd.DataFrame({'generation': generations, 'accuracy': accuracy})
+
+
+@st.cache_resource
+def get_scheduler():
+    return JobScheduler(MAX_WORKERS, SESSION_QUOTA)
+
+
+def purge_exports():
+    # Sessions that closed without starting another run leave their last export behind
+    cutoff = time.time() - EXPORT_MAX_AGE
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def make_history_entry(generation, candidate_html):
+    return "<div style='background-color: #23272b; padding: 8px; border-radius: 4px;'>" + \
+        T['history_entry'].format(
+            generation=generation,
+            candidate=candidate_html
+        ) + "</div>"
 
 
 if 'lang' not in st.session_state:
@@ -25,7 +104,7 @@ with st.sidebar:
     )
     st.session_state.lang = 'pt' if selected_lang_name.startswith('🇧🇷') else 'en'
 
-T = translations[st.session_state.lang]
+T = get_translations(st.session_state.lang)
 st.markdown(
     """
     <style>
@@ -68,6 +147,14 @@ with st.sidebar:
         help=T['population_size_help']
     )
 
+    seed_input = st.number_input(
+        T['seed_label'],
+        min_value=0,
+        value=0,
+        step=1,
+        help=T['seed_help']
+    )
+
     col1, col2 = st.columns(2)
     start_button = col1.button(
         T['start_button'],
@@ -76,6 +163,9 @@ with st.sidebar:
     )
     stop_button = col2.button(T['stop_button'], use_container_width=True)
 
+    profiling_enabled = st.checkbox(T['profiling_label'], help=T['profiling_help'])
+    profile_placeholder = st.empty()
+
 if 'running' not in st.session_state:
     st.session_state.running = False
 if 'best_candidate' not in st.session_state:
@@ -84,8 +174,42 @@ if 'generation' not in st.session_state:
     st.session_state.generation = 0
 if 'history' not in st.session_state:
     st.session_state.history = []
-if 'accuracy_history' not in st.session_state:
-    st.session_state.accuracy_history = []
+if 'worker' not in st.session_state:
+    st.session_state.worker = None
+if 'run_key' not in st.session_state:
+    st.session_state.run_key = None
+if 'profiler' not in st.session_state:
+    st.session_state.profiler = PhaseProfiler()
+if 'export_path' not in st.session_state:
+    st.session_state.export_path = None
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+
+def show_profile_panel(profiler, snapshot):
+    with profile_placeholder.container():
+        st.subheader(T['profiling_header'])
+        col1, col2 = st.columns(2)
+        generations_per_second = snapshot.generation / snapshot.elapsed if snapshot.elapsed else 0.0
+        col1.metric(T['generations_per_second'], f"{generations_per_second:,.0f}")
+        col2.metric(T['render_share'], f"{100 * profiler.render_share():.0f}%")
+        rows = profiler.summary()
+        if snapshot.generation:
+            rows.append({
+                'phase': 'evolve (worker)',
+                'mean_ms': 1000 * snapshot.elapsed / snapshot.generation,
+                'p95_ms': None,
+                'share_%': None,
+            })
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        st.download_button(
+            T['profiling_export'],
+            profiler.export_csv(),
+            file_name="weasel_profile.csv",
+            mime="text/csv",
+            key=f"profile_export_{profiler.frame}"
+        )
+
 
 if start_button:
     if not target_phrase_input:
@@ -95,18 +219,63 @@ if start_button:
     else:
         st.session_state.running = True
         st.session_state.target_phrase = target_phrase_input
-        st.session_state.best_candidate = generate_random_phrase(
-            len(target_phrase_input)
-        )
+        st.session_state.best_candidate = ""
         st.session_state.generation = 0
         st.session_state.mutation_rate = mutation_rate_input
         st.session_state.population_size = population_size_input
+        st.session_state.run_key = None
+        if seed_input:
+            st.session_state.run_key = run_key(
+                target_phrase_input,
+                mutation_rate_input,
+                population_size_input,
+                int(seed_input),
+                None
+            )
+        if st.session_state.worker is not None:
+            st.session_state.worker.stop()
+        if st.session_state.export_path is not None and os.path.exists(st.session_state.export_path):
+            os.remove(st.session_state.export_path)
+        st.session_state.export_path = None
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        purge_exports()
+        cached_run = None
+        if st.session_state.run_key is not None:
+            cached_run = get_run_cache().get(st.session_state.run_key)
+        if cached_run is not None:
+            st.session_state.worker = ReplayWorker(cached_run)
+            st.session_state.worker.start()
+        else:
+            st.session_state.export_path = os.path.join(
+                EXPORT_DIR,
+                f"{st.session_state.session_id}-{time.time_ns()}.{default_format()}"
+            )
+            try:
+                st.session_state.worker = get_scheduler().submit(st.session_state.session_id, {
+                    'target': st.session_state.target_phrase,
+                    'mutation_rate': st.session_state.mutation_rate,
+                    'population_size': st.session_state.population_size,
+                    'seed': int(seed_input) if seed_input else None,
+                    # Candidate history only feeds the run cache, which needs a seed
+                    'checkpoint_every': CHECKPOINT_EVERY if st.session_state.run_key else 0,
+                    'history_size': HISTORY_SIZE,
+                    'state_path': checkpoint_path(STATE_DIR, st.session_state.run_key) if st.session_state.run_key else None,
+                    'state_interval': STATE_INTERVAL,
+                    'max_generations': MAX_JOB_GENERATIONS,
+                    'export_path': st.session_state.export_path,
+                })
+            except QuotaExceeded:
+                st.session_state.running = False
+                st.session_state.worker = None
+                st.sidebar.error(T['quota_error'].format(quota=SESSION_QUOTA))
+                st.stop()
     st.session_state.history = []
-    st.session_state.accuracy_history = []
     st.rerun()
 
 if stop_button:
     st.session_state.running = False
+    if st.session_state.worker is not None:
+        st.session_state.worker.stop()
     st.rerun()
 
 if st.session_state.running:
@@ -118,46 +287,73 @@ if st.session_state.running:
     history_placeholder = st.empty()
 
     target_len = len(st.session_state.target_phrase)
+    prediction = None
+    prediction_known = target_len <= MAX_PREDICTION_LENGTH
+    if prediction_known:
+        prediction = cached_prediction(
+            target_len,
+            st.session_state.mutation_rate,
+            st.session_state.population_size
+        )
+
+    history_renderer = HighlightRenderer(st.session_state.target_phrase)
+    output_renderer = HighlightRenderer(
+        st.session_state.target_phrase,
+        matched='<span style="color: #28a745; font-weight: bold;">{text}</span>'
+    )
+    worker = st.session_state.worker
+    if isinstance(worker, ReplayWorker) and not st.session_state.history:
+        for generation in sorted(worker.checkpoints)[-HISTORY_SIZE:-1]:
+            st.session_state.history.append(make_history_entry(
+                generation,
+                history_renderer.render(worker.checkpoints[generation])
+            ))
 
+    profiler = st.session_state.profiler if profiling_enabled else NullProfiler()
+    panel_shown_at = 0.0
+    rendered_generation = None
+    chart_window = ChartWindow(MAX_CHART_POINTS, CHART_TAIL_POINTS)
     while st.session_state.running:
-        if st.session_state.best_candidate == st.session_state.target_phrase:
+        with profiler.phase('snapshot'):
+            snapshot = worker.snapshot()
+        if snapshot.done:
             st.session_state.running = False
+        if snapshot.candidate is None:
+            if st.session_state.running:
+                progress_placeholder.info(T['queued_message'])
+                with profiler.phase('sleep'):
+                    time.sleep(1 / REFRESH_HZ)
+                continue
+            break
+        if snapshot.generation == rendered_generation:
+            if st.session_state.running:
+                with profiler.phase('sleep'):
+                    time.sleep(1 / REFRESH_HZ)
+                continue
             break
+        profiler.next_frame()
 
-        st.session_state.generation += 1
-        population = reproduce(
-            st.session_state.best_candidate,
-            st.session_state.population_size,
-            st.session_state.mutation_rate
-        )
-        st.session_state.best_candidate, best_score = select_best(
-            population,
-            st.session_state.target_phrase
-        )
+        rendered_generation = snapshot.generation
+        st.session_state.generation = snapshot.generation
+        st.session_state.best_candidate = snapshot.candidate
+        best_score = snapshot.score
+
+        with profiler.phase('html'):
+            highlighted_candidate = history_renderer.render(st.session_state.best_candidate)
+            styled_output = output_renderer.render(st.session_state.best_candidate)
 
-        highlighted_candidate = ""
-        for i, char in enumerate(st.session_state.best_candidate):
-            if char == st.session_state.target_phrase[i]:
-                highlighted_candidate += char
-            else:
-                highlighted_candidate += f'<span style="color: #dc3545;">{char}</span>'
-
-        history_entry = "<div style='background-color: #23272b; padding: 8px; border-radius: 4px;'>" + \
-            T['history_entry'].format(
-                generation=st.session_state.generation,
-                candidate=highlighted_candidate
-            ) + "</div>"
-        st.session_state.history.append(history_entry)
-        if len(st.session_state.history) > 15:
-            st.session_state.history.pop(0)
+            history_entry = make_history_entry(
+                st.session_state.generation,
+                highlighted_candidate
+            )
+            st.session_state.history.append(history_entry)
+            if len(st.session_state.history) > HISTORY_SIZE:
+                st.session_state.history.pop(0)
 
         accuracy = (best_score / target_len) * 100
-        st.session_state.accuracy_history.append(accuracy)
-        if len(st.session_state.accuracy_history) > 100:
-            st.session_state.accuracy_history.pop(0)
 
-        with metrics_placeholder.container():
-            col1, col2, col3 = st.columns(3)
+        with profiler.phase('metrics'), metrics_placeholder.container():
+            col1, col2, col3, col4 = st.columns(4)
             col1.metric(
                 T['generation_metric'],
                 f"{st.session_state.generation}"
@@ -170,48 +366,75 @@ if st.session_state.running:
                 T['accuracy_metric'],
                 f"{accuracy:.2f}%"
             )
+            if prediction is not None:
+                expected, std, low, high = prediction
+                col4.metric(
+                    T['prediction_metric'],
+                    T['prediction_value'].format(expected=expected, std=std),
+                    help=T['prediction_help'].format(low=low, high=high)
+                )
+            elif prediction_known:
+                col4.metric(
+                    T['prediction_metric'],
+                    T['prediction_unreachable'].format(limit=MAX_EXPECTED),
+                    help=T['prediction_unreachable_help']
+                )
 
-        with chart_placeholder.container():
-            df_chart = pd.DataFrame({
-                'Geração': list(range(1, len(st.session_state.accuracy_history)+1)),
-                'Precisão (%)': st.session_state.accuracy_history
-            })
-            chart = alt.Chart(df_chart).mark_line().encode(
-                x=alt.X('Geração', title='Geração'),
-                y=alt.Y('Precisão (%)', title='Precisão (%)')
-            ).properties(width='container', height=250)
-            st.altair_chart(chart, use_container_width=True)
-
-        progress_bar_text = T['progress_bar_text'].format(accuracy=accuracy)
-        progress_placeholder.progress(int(accuracy), text=progress_bar_text)
-
-        styled_output = ""
-        for i, char in enumerate(st.session_state.best_candidate):
-            if char == st.session_state.target_phrase[i]:
-                styled_output += f'<span style="color: #28a745; font-weight: bold;">{char}</span>'
-            else:
-                styled_output += f'<span style="color: #dc3545;">{char}</span>'
-
-        output_placeholder.markdown(
-        f"""<div style="font-family: 'Courier New', monospace; font-size: 24px; letter-spacing: 2px; border: 1px solid #444; padding: 15px; border-radius: 5px; background-color: #1a1a1a;">
-    {styled_output}</div>""",
-        unsafe_allow_html=True
-    )
+        with profiler.phase('chart_build'):
+            generations, scores = chart_window.update(worker.telemetry.scores)
+            df_chart = chart_frame(generations, scores * (100 / target_len))
+        with profiler.phase('chart_send'):
+            chart_placeholder.vega_lite_chart(df_chart, chart_spec(), use_container_width=True)
+
+        with profiler.phase('markdown'):
+            progress_bar_text = T['progress_bar_text'].format(accuracy=accuracy)
+            progress_placeholder.progress(int(accuracy), text=progress_bar_text)
 
-        with history_placeholder.container():
-            st.markdown("---")
-            st.subheader(T['history_header'])
-            for entry in reversed(st.session_state.history):
-                st.markdown(entry, unsafe_allow_html=True)
+            output_placeholder.markdown(
+            f"""<div style="font-family: 'Courier New', monospace; font-size: 24px; letter-spacing: 2px; border: 1px solid #444; padding: 15px; border-radius: 5px; background-color: #1a1a1a;">
+        {styled_output}</div>""",
+            unsafe_allow_html=True
+        )
+
+            with history_placeholder.container():
+                st.markdown("---")
+                st.subheader(T['history_header'])
+                for entry in reversed(st.session_state.history):
+                    st.markdown(entry, unsafe_allow_html=True)
+
+        if profiling_enabled and (not st.session_state.running or time.perf_counter() - panel_shown_at >= PROFILE_PANEL_INTERVAL):
+            show_profile_panel(profiler, snapshot)
+            panel_shown_at = time.perf_counter()
 
-        time.sleep(0.01)
+        if st.session_state.running:
+            with profiler.phase('sleep'):
+                time.sleep(1 / REFRESH_HZ)
 
-    if not st.session_state.running and st.session_state.best_candidate:
+    if st.session_state.run_key is not None and worker.converged and not isinstance(worker, ReplayWorker):
+        get_run_cache().put(st.session_state.run_key, worker.trajectory())
+
+    if worker.error is not None:
+        st.error(T['job_error'].format(error=f"{type(worker.error).__name__}: {worker.error}"))
+    elif not st.session_state.running and st.session_state.best_candidate:
         if st.session_state.best_candidate == st.session_state.target_phrase:
             st.success(T['success_message'].format(
                 generation=st.session_state.generation)
             )
+        elif st.session_state.generation >= MAX_JOB_GENERATIONS:
+            st.warning(T['limit_message'].format(limit=MAX_JOB_GENERATIONS))
         else:
             st.warning(T['stop_message'])
 else:
     st.info(T['info_message'])
+
+export_path = st.session_state.export_path
+worker = st.session_state.worker
+if not st.session_state.running and export_path and worker is not None and worker.done and os.path.exists(export_path):
+    with open(export_path, 'rb') as stream:
+        st.sidebar.download_button(
+            T['export_button'],
+            stream.read(),
+            file_name=f"weasel_trajectory.{export_path.rsplit('.', 1)[1]}",
+            mime="application/octet-stream",
+            help=T['export_help']
+        )
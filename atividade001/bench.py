@@ -0,0 +1,199 @@
+import argparse
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from core import GENERATION_MODES, POSSIBLE_CHARS, generate_random_phrase, mutate_phrase, reproduce, select_best, weasel_stream
+from packed import packed_stream
+
+LENGTHS = [10, 100, 1000, 10000, 100000]
+POPULATIONS = [10, 100, 1000, 10000]
+RATES = [0.01, 0.05]
+QUICK_LENGTHS = [10, 100, 1000]
+QUICK_POPULATIONS = [10, 100, 1000]
+# The public string API: reproduce + select_best per generation, and bare mutate_phrase calls
+STRING_MODES = ['string', 'mutate_phrase']
+# The bit-packed genome from packed.py
+PACKED_MODES = ['packed']
+
+
+def make_target(length, seed):
+    rng = np.random.default_rng(seed)
+    return ''.join(rng.choice(list(POSSIBLE_CHARS), size=length))
+
+
+def cell_key(cell):
+    return f"{cell['mode']}/L{cell['length']}/P{cell['population_size']}/r{cell['mutation_rate']:g}"
+
+
+def bench_cell(length, population_size, mutation_rate, mode, seed, budget, max_generations):
+    target = make_target(length, seed)
+    if mode in PACKED_MODES:
+        stream = packed_stream(
+            target, mutation_rate, population_size, seed, max_generations=max_generations, include_candidate=False
+        )
+    else:
+        stream = weasel_stream(
+            target, mutation_rate, population_size, seed,
+            max_generations=max_generations, include_candidate=False, mode=mode
+        )
+    start = time.perf_counter()
+    snapshot = None
+    for snapshot in stream:
+        if time.perf_counter() - start >= budget:
+            break
+    seconds = time.perf_counter() - start
+    converged = snapshot.score == length
+    return {
+        'mode': mode,
+        'length': length,
+        'population_size': population_size,
+        'mutation_rate': mutation_rate,
+        'generations': snapshot.generation,
+        'seconds': seconds,
+        'generations_per_sec': snapshot.generation / seconds if seconds else 0.0,
+        'converged': converged,
+        'time_to_target': seconds if converged else None,
+        'final_score': snapshot.score,
+    }
+
+
+def string_generations(target, population_size, mutation_rate, mode):
+    parent = generate_random_phrase(len(target))
+    score = sum(1 for a, b in zip(parent, target) if a == b)
+    while True:
+        yield score
+        if mode == 'mutate_phrase':
+            for _ in range(population_size):
+                mutate_phrase(parent, mutation_rate)
+        else:
+            parent, score = select_best(reproduce(parent, population_size, mutation_rate), target)
+
+
+def bench_string_cell(length, population_size, mutation_rate, mode, seed, budget, max_generations):
+    target = make_target(length, seed)
+    # generate_random_phrase, mutate_phrase and the NumPy engine behind reproduce all draw from this state
+    random.seed(seed)
+    start = time.perf_counter()
+    generation = -1
+    for generation, score in enumerate(string_generations(target, population_size, mutation_rate, mode)):
+        if score == length or generation == max_generations or time.perf_counter() - start >= budget:
+            break
+    seconds = time.perf_counter() - start
+    converged = mode == 'string' and score == length
+    return {
+        'mode': mode,
+        'length': length,
+        'population_size': population_size,
+        'mutation_rate': mutation_rate,
+        'generations': generation,
+        'seconds': seconds,
+        'generations_per_sec': generation / seconds if seconds else 0.0,
+        'converged': converged,
+        'time_to_target': seconds if converged else None,
+        'final_score': score,
+    }
+
+
+def run_matrix(lengths, populations, rates, modes, seed=0, budget=1.0, max_generations=100000, max_cells=10 ** 8,
+               progress=None, max_string_cells=10 ** 6):
+    results = []
+    for mode, length, population_size, rate in itertools.product(modes, lengths, populations, rates):
+        string_mode = mode in STRING_MODES
+        if length * population_size > (max_string_cells if string_mode else max_cells):
+            continue
+        cell = bench_string_cell if string_mode else bench_cell
+        result = cell(length, population_size, rate, mode, seed, budget, max_generations)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+    }
+
+
+def compare(results, baseline, threshold):
+    reference = {cell_key(cell): cell for cell in baseline['results']}
+    regressions = []
+    rows = []
+    for cell in results:
+        key = cell_key(cell)
+        if key not in reference or not reference[key]['generations_per_sec']:
+            continue
+        ratio = cell['generations_per_sec'] / reference[key]['generations_per_sec']
+        rows.append((key, reference[key]['generations_per_sec'], cell['generations_per_sec'], ratio))
+        if ratio < 1 - threshold:
+            regressions.append(key)
+    return rows, regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Weasel core and gate on regressions")
+    parser.add_argument('--quick', action='store_true', help="small matrix for local checks")
+    parser.add_argument('--lengths', nargs='+', type=int, default=None)
+    parser.add_argument('--populations', nargs='+', type=int, default=None)
+    parser.add_argument('--rates', nargs='+', type=float, default=RATES)
+    parser.add_argument(
+        '--modes', nargs='+', choices=sorted(GENERATION_MODES) + PACKED_MODES + STRING_MODES,
+        default=['dense', 'sparse', 'latching'] + PACKED_MODES + STRING_MODES
+    )
+    parser.add_argument('--budget', type=float, default=1.0, help="seconds per cell")
+    parser.add_argument('--max-generations', type=int, default=100000)
+    parser.add_argument('--max-cells', type=int, default=10 ** 8, help="skip cells with length * population above this")
+    parser.add_argument('--max-string-cells', type=int, default=10 ** 6,
+                        help="same limit for the pure-Python string API cells")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="write results as JSON")
+    parser.add_argument('--baseline', default=None, help="JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="allowed generations/sec drop (fraction)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    lengths = args.lengths or (QUICK_LENGTHS if args.quick else LENGTHS)
+    populations = args.populations or (QUICK_POPULATIONS if args.quick else POPULATIONS)
+
+    def progress(result):
+        target = f"{result['time_to_target']:.3f}s" if result['converged'] else '-'
+        print(
+            f"{cell_key(result):<32}{result['generations_per_sec']:>12.1f} gen/s"
+            f"{result['generations']:>9} gens  to target {target}",
+            file=sys.stderr
+        )
+
+    results = run_matrix(
+        lengths, populations, args.rates, args.modes, args.seed, args.budget, args.max_generations,
+        args.max_cells, progress, args.max_string_cells
+    )
+    report = {'environment': environment(), 'seed': args.seed, 'budget': args.budget, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as stream:
+            json.dump(report, stream, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as stream:
+            baseline = json.load(stream)
+        rows, regressions = compare(results, baseline, args.threshold)
+        print(f"{'cell':<32}{'baseline':>12}{'current':>12}{'ratio':>9}")
+        for key, before, after, ratio in rows:
+            flag = '  REGRESSION' if key in regressions else ''
+            print(f"{key:<32}{before:>12.1f}{after:>12.1f}{ratio:>8.2f}x{flag}")
+        if regressions:
+            sys.exit(f"{len(regressions)} cell(s) regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import time
+
+import numpy as np
+
+from bench import make_target
+from core import GENERATION_MODES, weasel_stream
+
+
+def timed_run(target, mutation_rate, population_size, mode, seed, max_generations):
+    stream = weasel_stream(
+        target, mutation_rate, population_size, seed, max_generations=max_generations,
+        include_candidate=False, mode=mode
+    )
+    times = []
+    scores = []
+    start = time.perf_counter()
+    for snapshot in stream:
+        times.append(time.perf_counter() - start)
+        scores.append(snapshot.score)
+    return np.array(times), np.array(scores)
+
+
+def decile_costs(times):
+    # Wall time of the first and last 10% of generations
+    generations = times.size - 1
+    tenth = max(generations // 10, 1)
+    return times[tenth] - times[0], times[-1] - times[-1 - tenth]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare latching against the non-latching generation modes")
+    parser.add_argument('--lengths', nargs='+', type=int, default=[1000, 10000, 100000])
+    parser.add_argument('--population-size', type=int, default=100)
+    parser.add_argument('--mutation-rate', type=float, default=None, help="defaults to 1 / length")
+    parser.add_argument('--modes', nargs='+', choices=sorted(GENERATION_MODES), default=['dense', 'sparse', 'latching'])
+    parser.add_argument('--max-generations', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"{'length':>8}{'mode':>10}{'gens':>8}{'final %':>9}{'total s':>10}{'first 10%':>11}{'last 10%':>10}{'ratio':>7}")
+    for length in args.lengths:
+        target = make_target(length, args.seed)
+        rate = args.mutation_rate if args.mutation_rate is not None else 1 / length
+        for mode in args.modes:
+            times, scores = timed_run(target, rate, args.population_size, mode, args.seed, args.max_generations)
+            first, last = decile_costs(times)
+            print(
+                f"{length:>8}{mode:>10}{times.size - 1:>8}{100 * scores[-1] / length:>9.1f}{times[-1]:>10.3f}"
+                f"{first:>11.3f}{last:>10.3f}{last / first if first else 0.0:>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import time
+
+import numpy as np
+
+from core import SCHEDULES, convergence_stats, evolve_until, make_schedule
+
+DEFAULT_TARGET = (
+    "methinks it is like a weasel and the cloud is very like a whale "
+    "or like a camel indeed by the mass and tis like a camel indeed"
+)
+
+
+def bench_schedule(name, target, rate, population_size, runs, max_generations, seed):
+    generations = np.empty(runs, dtype=np.int64)
+    start = time.perf_counter()
+    for run, run_seed in enumerate(np.random.SeedSequence(seed).spawn(runs)):
+        trajectory = evolve_until(
+            target, rate, population_size, max_generations, run_seed,
+            schedule=make_schedule(name, rate)
+        )
+        generations[run] = trajectory.generations if trajectory.converged else -1
+    seconds = time.perf_counter() - start
+    stats = convergence_stats(generations)
+    stats['ms_per_run'] = 1000 * seconds / runs
+    return stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare mutation-rate schedules against the fixed rate")
+    parser.add_argument('--target', default=DEFAULT_TARGET)
+    parser.add_argument('--rates', nargs='+', type=float, default=[0.02, 0.05, 0.1])
+    parser.add_argument('--population-size', type=int, default=100)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--max-generations', type=int, default=5000)
+    parser.add_argument('--schedules', nargs='+', choices=sorted(SCHEDULES), default=list(SCHEDULES))
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"{'schedule':<14}{'rate':>7}{'converged':>11}{'mean gen':>10}{'median':>9}{'p95':>8}{'ms/run':>9}")
+    for rate in args.rates:
+        for name in args.schedules:
+            stats = bench_schedule(
+                name, args.target, rate, args.population_size, args.runs, args.max_generations, args.seed
+            )
+            print(
+                f"{name:<14}{rate:>7.3f}{stats['converged']:>6}/{stats['runs']:<4}"
+                f"{stats['mean']:>10.1f}{stats['median']:>9.1f}{stats['p95']:>8.1f}{stats['ms_per_run']:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
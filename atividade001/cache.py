@@ -0,0 +1,113 @@
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from core import Trajectory, evolve_until
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'weasel', 'runs.sqlite')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def run_key(target, mutation_rate, population_size, seed, max_generations, mode='dense', checkpoints=None):
+    if checkpoints is not None and not isinstance(checkpoints, int):
+        checkpoints = sorted(checkpoints)
+    return json.dumps([target, float(mutation_rate), int(population_size), seed, max_generations, mode, checkpoints])
+
+
+def pack_trajectory(trajectory):
+    generations = np.array(sorted(trajectory.checkpoints), dtype=np.int64)
+    candidates = ''.join(trajectory.checkpoints[g] for g in generations.tolist())
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        scores=trajectory.scores,
+        generations=generations,
+        candidates=np.frombuffer(candidates.encode('ascii'), dtype=np.uint8),
+        converged=np.array(trajectory.converged),
+    )
+    return buffer.getvalue()
+
+
+def unpack_trajectory(target, payload):
+    data = np.load(io.BytesIO(payload))
+    text = data['candidates'].tobytes().decode('ascii')
+    length = len(target)
+    checkpoints = {
+        int(generation): text[i * length:(i + 1) * length]
+        for i, generation in enumerate(data['generations'])
+    }
+    return Trajectory(target, data['scores'], checkpoints, bool(data['converged']))
+
+
+class RunCache:
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "key TEXT PRIMARY KEY, target TEXT, payload BLOB, size INTEGER, last_used REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS runs_last_used ON runs (last_used)")
+        self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT target, payload FROM runs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE runs SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return unpack_trajectory(row[0], row[1])
+
+    def put(self, key, trajectory):
+        payload = pack_trajectory(trajectory)
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?)",
+                (key, trajectory.target, payload, len(payload), time.time())
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM runs").fetchone()[0]
+        rows = self._db.execute("SELECT key, size FROM runs ORDER BY last_used").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM runs WHERE key = ?", (key,))
+            total -= size
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM runs")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def evolve(self, target, mutation_rate=0.05, population_size=100, max_generations=100000, seed=None,
+               checkpoints=None, mode='dense'):
+        if seed is None:
+            return evolve_until(target, mutation_rate, population_size, max_generations, seed, checkpoints, mode)
+        key = run_key(target, mutation_rate, population_size, seed, max_generations, mode, checkpoints)
+        trajectory = self.get(key)
+        if trajectory is None:
+            trajectory = evolve_until(target, mutation_rate, population_size, max_generations, seed, checkpoints, mode)
+            self.put(key, trajectory)
+        return trajectory
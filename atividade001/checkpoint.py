@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from core import NUM_CHARS, encode, weasel_stream
+from telemetry import Telemetry
+
+MAGIC = b'WEASELCK'
+VERSION = 1
+_HEADER = struct.Struct('<8sII')
+
+
+@dataclass
+class EngineState:
+    target: str
+    mutation_rate: float
+    population_size: int
+    mode: str
+    generation: int
+    best: np.ndarray
+    rng_state: dict
+    scores: np.ndarray
+    elapsed: float = 0.0
+
+    def matches(self, target, mutation_rate, population_size, mode):
+        return (self.target, self.mutation_rate, self.population_size, self.mode) == \
+            (target, mutation_rate, population_size, mode)
+
+
+def checkpoint_path(directory, key):
+    return os.path.join(directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.ckpt')
+
+
+def restore_rng(rng_state):
+    bit_generator = getattr(np.random, rng_state['bit_generator'])()
+    bit_generator.state = rng_state
+    return np.random.Generator(bit_generator)
+
+
+def save_checkpoint(path, state):
+    meta = json.dumps({
+        'target': state.target,
+        'mutation_rate': state.mutation_rate,
+        'population_size': state.population_size,
+        'mode': state.mode,
+        'generation': state.generation,
+        'rng_state': state.rng_state,
+        'scores': int(state.scores.size),
+        'elapsed': state.elapsed,
+    }).encode('utf-8')
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # Write to a sibling temp file and rename, so a crash never leaves half a checkpoint
+    fd, temporary = tempfile.mkstemp(dir=directory, prefix='.ckpt-')
+    try:
+        with os.fdopen(fd, 'wb') as stream:
+            stream.write(_HEADER.pack(MAGIC, VERSION, len(meta)))
+            stream.write(meta)
+            stream.write(np.ascontiguousarray(state.best, dtype=np.uint8).tobytes())
+            stream.write(np.ascontiguousarray(state.scores, dtype=np.int32).tobytes())
+            stream.flush()
+            os.fsync(stream.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def load_checkpoint(path):
+    with open(path, 'rb') as stream:
+        data = stream.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"truncated checkpoint: {path}")
+    magic, version, meta_size = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a Weasel checkpoint (version {VERSION}): {path}")
+    offset = _HEADER.size
+    meta = json.loads(data[offset:offset + meta_size])
+    offset += meta_size
+    length = len(meta['target'])
+    best = np.frombuffer(data, dtype=np.uint8, count=length, offset=offset).copy()
+    offset += length
+    scores = np.frombuffer(data, dtype=np.int32, count=meta['scores'], offset=offset).copy()
+    return EngineState(
+        meta['target'], meta['mutation_rate'], meta['population_size'], meta['mode'], meta['generation'],
+        best, meta['rng_state'], scores, meta['elapsed']
+    )
+
+
+def resumable_run(path, target, mutation_rate=0.05, population_size=100, seed=None, mode='dense',
+                  interval=30.0, max_generations=None, every=1):
+    state = load_checkpoint(path) if os.path.exists(path) else None
+    if state is not None and not state.matches(target, mutation_rate, population_size, mode):
+        raise ValueError(f"checkpoint {path} was written for different run parameters")
+    telemetry = Telemetry()
+    if state is None:
+        rng = np.random.default_rng(seed)
+        best = rng.integers(0, NUM_CHARS, size=len(target), dtype=np.uint8)
+        telemetry.append(int(np.count_nonzero(best == encode(target))))
+        generation, elapsed = 0, 0.0
+    else:
+        rng = restore_rng(state.rng_state)
+        best, generation, elapsed = state.best, state.generation, state.elapsed
+        telemetry.extend(state.scores)
+
+    stream = weasel_stream(
+        target, mutation_rate, population_size, rng, mode=mode, initial=best, start=generation,
+        max_generations=max_generations
+    )
+    started = time.perf_counter() - elapsed
+    saved_at = time.perf_counter()
+    saved_generation = generation
+    snapshot = None
+
+    def save(snapshot, now):
+        save_checkpoint(path, EngineState(
+            target, mutation_rate, population_size, mode, snapshot.generation, snapshot.codes,
+            rng.bit_generator.state, telemetry.scores, now - started
+        ))
+
+    try:
+        for snapshot in stream:
+            if snapshot.generation > generation:
+                telemetry.append(snapshot.score)
+            now = time.perf_counter()
+            finished = snapshot.score == len(target) or snapshot.generation == max_generations
+            if finished or now - saved_at >= interval:
+                save(snapshot, now)
+                saved_at, saved_generation = now, snapshot.generation
+            if finished or snapshot.generation % every == 0:
+                yield snapshot
+    except GeneratorExit:
+        # Closing the stream early (a stop) still records where it got to; the RNG is suspended
+        # right after the last snapshot, so the saved state resumes exactly
+        if snapshot is not None and snapshot.generation != saved_generation:
+            save(snapshot, time.perf_counter())
+        raise
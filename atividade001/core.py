@@ -1,8 +1,20 @@
 import random
 import string
+from dataclasses import dataclass, field
+
+import numpy as np
 
 POSSIBLE_CHARS = string.ascii_lowercase + string.digits + ' '
 
+# Candidates are held as uint8 codes: index of each char in POSSIBLE_CHARS
+NUM_CHARS = len(POSSIBLE_CHARS)
+CHAR_TABLE = np.frombuffer(POSSIBLE_CHARS.encode('ascii'), dtype=np.uint8)
+CODE_TABLE = np.full(256, 255, dtype=np.uint8)
+CODE_TABLE[CHAR_TABLE] = np.arange(NUM_CHARS, dtype=np.uint8)
+
+_rng = np.random.default_rng()
+
+
 def validate_input(phrase):
     return all(char in POSSIBLE_CHARS for char in phrase)
 
@@ -18,10 +30,45 @@ def mutate_phrase(phrase, mutation_rate=0.05):
             new_phrase.append(char)
     return ''.join(new_phrase)
 
+def encode(phrase):
+    return CODE_TABLE[np.frombuffer(phrase.encode('ascii'), dtype=np.uint8)]
+
+def decode(codes):
+    return CHAR_TABLE[codes].tobytes().decode('ascii')
+
+def encode_population(population):
+    if not population:
+        return np.empty((0, 0), dtype=np.uint8)
+    return CODE_TABLE[np.frombuffer(''.join(population).encode('ascii'), dtype=np.uint8)].reshape(len(population), -1)
+
+def decode_population(population):
+    return [decode(row) for row in population]
+
+def reproduce_array(parent, population_size=100, mutation_rate=0.05, rng=None):
+    rng = _rng if rng is None else rng
+    population = np.broadcast_to(parent, (population_size, parent.size)).copy()
+    mask = rng.random(population.shape) < mutation_rate
+    population[mask] = rng.integers(0, NUM_CHARS, size=np.count_nonzero(mask), dtype=np.uint8)
+    return population
+
+def score_population(population, target):
+    return np.count_nonzero(population == target, axis=1)
+
+def select_best_array(population, target):
+    scores = score_population(population, target)
+    best = int(np.argmax(scores))
+    return population[best], int(scores[best])
+
 def reproduce(best_candidate, population_size=100, mutation_rate=0.05):
-    return [mutate_phrase(best_candidate, mutation_rate) for _ in range(population_size)]
+    if not validate_input(best_candidate):
+        # Characters outside the alphabet have no code; keep the plain string path for them
+        return [mutate_phrase(best_candidate, mutation_rate) for _ in range(population_size)]
+    # Seed the array engine from the random module, so random.seed() still makes this reproducible
+    rng = np.random.default_rng(random.getrandbits(64))
+    population = reproduce_array(encode(best_candidate), population_size, mutation_rate, rng)
+    return decode_population(population)
 
-def select_best(population, target_phrase):
+def _select_best_strings(population, target_phrase):
     best_score = -1
     best_candidate = ''
     for phrase in population:
@@ -30,3 +77,324 @@ def select_best(population, target_phrase):
             best_score = score
             best_candidate = phrase
     return best_candidate, best_score
+
+def select_best(population, target_phrase):
+    if not population:
+        return '', -1
+    if any(len(phrase) != len(target_phrase) for phrase in population) or not target_phrase.isascii() or \
+            not all(phrase.isascii() for phrase in population):
+        return _select_best_strings(population, target_phrase)
+    codes = encode_population(population)
+    target = encode(target_phrase)
+    if (target == 255).any() or (codes == 255).any():
+        return _select_best_strings(population, target_phrase)
+    scores = score_population(codes, target)
+    best = int(np.argmax(scores))
+    return population[best], int(scores[best])
+
+def bernoulli_indices(size, p, rng=None):
+    # Flat indices hit by independent Bernoulli(p) trials, via geometric gaps
+    rng = _rng if rng is None else rng
+    if p <= 0 or size == 0:
+        return np.empty(0, dtype=np.int64)
+    if p >= 1:
+        return np.arange(size, dtype=np.int64)
+    chunks = []
+    last = -1
+    while last < size:
+        expected = (size - last) * p
+        gaps = rng.geometric(p, size=int(expected + 5 * np.sqrt(expected) + 16))
+        hits = last + np.cumsum(gaps)
+        last = int(hits[-1])
+        chunks.append(hits)
+    hits = np.concatenate(chunks)
+    return hits[:np.searchsorted(hits, size)]
+
+def sample_mutations(population_size, length, mutation_rate=0.05, rng=None):
+    # Bernoulli hits over the flattened population, split back into (row, position)
+    rng = _rng if rng is None else rng
+    keys = bernoulli_indices(population_size * length, mutation_rate, rng)
+    rows, positions = np.divmod(keys, length) if length else (keys, keys)
+    chars = rng.integers(0, NUM_CHARS, size=keys.size, dtype=np.uint8)
+    return rows, positions, chars, np.bincount(rows, minlength=population_size)
+
+def sparse_generation(parent, parent_score, target, population_size=100, mutation_rate=0.05, rng=None):
+    rows, positions, chars, counts = sample_mutations(population_size, parent.size, mutation_rate, rng)
+    target_chars = target[positions]
+    delta = (chars == target_chars).astype(np.int64) - (parent[positions] == target_chars)
+    scores = parent_score + np.bincount(rows, weights=delta, minlength=population_size).astype(np.int64)
+    best = int(np.argmax(scores))
+    selected = rows == best
+    positions, chars = positions[selected], chars[selected]
+    child = parent.copy()
+    child[positions] = chars
+    return child, int(scores[best]), int(np.count_nonzero(parent[positions] != chars))
+
+def dense_generation(parent, parent_score, target, population_size=100, mutation_rate=0.05, rng=None):
+    population = reproduce_array(parent, population_size, mutation_rate, rng)
+    scores = score_population(population, target)
+    best = int(np.argmax(scores))
+    # Copy so the chosen child does not keep the whole population alive
+    child = population[best].copy()
+    return child, int(scores[best]), int(np.count_nonzero(child != parent))
+
+def latching_step(parent, parent_score, target, unmatched, population_size=100, mutation_rate=0.05, rng=None):
+    # Matched positions are locked: sample, score and update only the unmatched index
+    rows, local, chars, counts = sample_mutations(population_size, unmatched.size, mutation_rate, rng)
+    positions = unmatched[local]
+    hits = chars == target[positions]
+    scores = parent_score + np.bincount(rows, weights=hits, minlength=population_size).astype(np.int64)
+    best = int(np.argmax(scores))
+    selected = rows == best
+    positions, chars = positions[selected], chars[selected]
+    child = parent.copy()
+    changed = int(np.count_nonzero(child[positions] != chars))
+    child[positions] = chars
+    if scores[best] > parent_score:
+        unmatched = np.delete(unmatched, local[selected][hits[selected]])
+    return child, int(scores[best]), changed, unmatched
+
+def latching_generation(parent, parent_score, target, population_size=100, mutation_rate=0.05, rng=None):
+    unmatched = np.flatnonzero(parent != target)
+    child, score, changed, _ = latching_step(parent, parent_score, target, unmatched, population_size, mutation_rate, rng)
+    return child, score, changed
+
+class LatchingStep:
+    # Carries the unmatched index between generations so each one costs O(unmatched)
+    def __init__(self):
+        self.unmatched = None
+
+    def __call__(self, parent, parent_score, target, population_size=100, mutation_rate=0.05, rng=None):
+        if self.unmatched is None:
+            self.unmatched = np.flatnonzero(parent != target)
+        child, score, changed, self.unmatched = latching_step(
+            parent, parent_score, target, self.unmatched, population_size, mutation_rate, rng
+        )
+        return child, score, changed
+
+GENERATION_MODES = {
+    'dense': dense_generation,
+    'sparse': sparse_generation,
+    'latching': latching_generation,
+}
+STATEFUL_MODES = {
+    'latching': LatchingStep,
+}
+
+def next_generation(parent, parent_score, target, population_size=100, mutation_rate=0.05, rng=None, mode='dense'):
+    if mode not in GENERATION_MODES:
+        raise ValueError(f"unknown generation mode: {mode!r}")
+    return GENERATION_MODES[mode](parent, parent_score, target, population_size, mutation_rate, rng)
+
+
+class FixedRate:
+    def __init__(self, rate=0.05):
+        self.rate = rate
+
+    def update(self, score, improvement, length):
+        pass
+
+class StagnationSchedule:
+    # Shrink the rate after `patience` generations without a new best
+    def __init__(self, rate=0.05, factor=0.5, patience=20, min_rate=0.001):
+        self.rate = rate
+        self.factor = factor
+        self.patience = patience
+        self.min_rate = min_rate
+        self._stalled = 0
+
+    def update(self, score, improvement, length):
+        self._stalled = 0 if improvement > 0 else self._stalled + 1
+        if self._stalled >= self.patience:
+            self.rate = max(self.rate * self.factor, self.min_rate)
+            self._stalled = 0
+
+class ScoreProportionalSchedule:
+    # Rate proportional to the fraction of characters still wrong
+    def __init__(self, rate=0.05, min_rate=None):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+
+    def update(self, score, improvement, length):
+        floor = self.min_rate if self.min_rate is not None else 1 / max(length, 1)
+        self.rate = max(self.max_rate * (length - score) / max(length, 1), floor)
+
+class OneFifthSchedule:
+    # Rechenberg's 1/5 success rule over a sliding window of generations
+    def __init__(self, rate=0.05, factor=0.85, window=10, min_rate=0.001, max_rate=1.0):
+        self.rate = rate
+        self.factor = factor
+        self.window = window
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self._successes = 0
+        self._seen = 0
+
+    def update(self, score, improvement, length):
+        self._successes += improvement > 0
+        self._seen += 1
+        if self._seen < self.window:
+            return
+        if self._successes * 5 > self._seen:
+            self.rate = min(self.rate / self.factor, self.max_rate)
+        elif self._successes * 5 < self._seen:
+            self.rate = max(self.rate * self.factor, self.min_rate)
+        self._successes = self._seen = 0
+
+SCHEDULES = {
+    'fixed': FixedRate,
+    'stagnation': StagnationSchedule,
+    'proportional': ScoreProportionalSchedule,
+    'one_fifth': OneFifthSchedule,
+}
+
+def make_schedule(name, rate=0.05, **options):
+    if name not in SCHEDULES:
+        raise ValueError(f"unknown mutation schedule: {name!r}")
+    return SCHEDULES[name](rate, **options)
+
+@dataclass
+class Snapshot:
+    generation: int
+    score: int
+    codes: np.ndarray = None
+    mutations: int = 0
+    mutation_rate: float = 0.0
+    improvement: int = 0
+
+    @property
+    def candidate(self):
+        return None if self.codes is None else decode(self.codes)
+
+def weasel_stream(target, mutation_rate=0.05, population_size=100, seed=None, every=1, max_generations=None,
+                  include_candidate=True, mode='dense', initial=None, schedule=None, start=0):
+    if mode not in GENERATION_MODES:
+        raise ValueError(f"unknown generation mode: {mode!r}")
+    rng = np.random.default_rng(seed)
+    step = STATEFUL_MODES[mode]() if mode in STATEFUL_MODES else GENERATION_MODES[mode]
+    target_codes = encode(target) if isinstance(target, str) else target
+    every = max(int(every), 1)
+    if initial is None:
+        parent = rng.integers(0, NUM_CHARS, size=target_codes.size, dtype=np.uint8)
+    else:
+        parent = encode(initial) if isinstance(initial, str) else initial
+    schedule = FixedRate(mutation_rate) if schedule is None else schedule
+    score = int(np.count_nonzero(parent == target_codes))
+    best_score = score
+    generation = start
+    mutations = 0
+    improvement = 0
+    rate = schedule.rate
+    done = score == target_codes.size or generation == max_generations
+    while True:
+        # Intermediate generations off the stride never build a Snapshot
+        if done or generation % every == 0:
+            yield Snapshot(generation, score, parent if include_candidate else None, mutations, rate, improvement)
+        if done:
+            return
+        generation += 1
+        rate = schedule.rate
+        parent, score, mutations = step(parent, score, target_codes, population_size, rate, rng)
+        improvement = max(score - best_score, 0)
+        best_score = max(best_score, score)
+        schedule.update(score, improvement, target_codes.size)
+        done = score == target_codes.size or generation == max_generations
+
+@dataclass
+class Trajectory:
+    target: str
+    scores: np.ndarray
+    checkpoints: dict = field(default_factory=dict)
+    converged: bool = False
+
+    @property
+    def generations(self):
+        return self.scores.size - 1
+
+    @property
+    def best(self):
+        return self.checkpoints[self.generations]
+
+def _checkpoint_set(checkpoints, max_generations):
+    if checkpoints is None:
+        return set()
+    if isinstance(checkpoints, int):
+        return set(range(0, max_generations + 1, max(checkpoints, 1)))
+    return set(checkpoints)
+
+def evolve_until(target, mutation_rate=0.05, population_size=100, max_generations=100000, seed=None,
+                 checkpoints=None, mode='dense', schedule=None):
+    wanted = _checkpoint_set(checkpoints, max_generations)
+    scores = np.empty(max_generations + 1, dtype=np.int32)
+    saved = {}
+    stream = weasel_stream(
+        target, mutation_rate, population_size, seed, 1, max_generations, True, mode, schedule=schedule
+    )
+    for snapshot in stream:
+        scores[snapshot.generation] = snapshot.score
+        if snapshot.generation in wanted:
+            saved[snapshot.generation] = snapshot.candidate
+    saved[snapshot.generation] = snapshot.candidate
+    return Trajectory(target, scores[:snapshot.generation + 1].copy(), saved, snapshot.score == len(target))
+
+@dataclass
+class BatchResult:
+    target: str
+    generations: np.ndarray
+    max_generations: int
+
+    @property
+    def converged(self):
+        return self.generations >= 0
+
+    def stats(self, percentiles=(5, 25, 50, 75, 95)):
+        return convergence_stats(self.generations, percentiles)
+
+def convergence_stats(generations, percentiles=(5, 25, 50, 75, 95)):
+    generations = np.asarray(generations)
+    done = generations[generations >= 0]
+    stats = {
+        'runs': int(generations.size),
+        'converged': int(done.size),
+        'mean': float(done.mean()) if done.size else float('nan'),
+        'std': float(done.std()) if done.size else float('nan'),
+        'median': float(np.median(done)) if done.size else float('nan'),
+    }
+    for q, value in zip(percentiles, np.percentile(done, percentiles) if done.size else [float('nan')] * len(percentiles)):
+        stats[f'p{q:g}'] = float(value)
+    return stats
+
+def _evolve_runs(target, parents, mutation_rate, population_size, max_generations, rng):
+    # parents: (runs, length); finished runs are dropped from the working set
+    generations = np.full(parents.shape[0], -1, dtype=np.int64)
+    active = np.arange(parents.shape[0])
+    done = np.all(parents == target, axis=1)
+    generations[done] = 0
+    active, parents = active[~done], parents[~done]
+    generation = 0
+    while active.size and generation < max_generations:
+        generation += 1
+        population = np.repeat(parents[:, None, :], population_size, axis=1)
+        hits = bernoulli_indices(population.size, mutation_rate, rng)
+        population.reshape(-1)[hits] = rng.integers(0, NUM_CHARS, size=hits.size, dtype=np.uint8)
+        scores = np.count_nonzero(population == target, axis=2)
+        best = np.argmax(scores, axis=1)
+        parents = population[np.arange(active.size), best]
+        done = scores[np.arange(active.size), best] == target.size
+        generations[active[done]] = generation
+        active, parents = active[~done], parents[~done]
+    return generations
+
+def evolve_batch(target, mutation_rate=0.05, population_size=100, runs=1000, max_generations=100000, seed=None,
+                 max_cells=1 << 24):
+    rng = np.random.default_rng(seed)
+    target_codes = encode(target)
+    parents = rng.integers(0, NUM_CHARS, size=(runs, target_codes.size), dtype=np.uint8)
+    # Bound the (runs, population, length) working array
+    chunk = max(1, max_cells // max(population_size * target_codes.size, 1))
+    generations = np.concatenate([
+        _evolve_runs(target_codes, parents[start:start + chunk], mutation_rate, population_size, max_generations, rng)
+        for start in range(0, runs, chunk)
+    ]) if runs else np.empty(0, dtype=np.int64)
+    return BatchResult(target, generations, max_generations)
@@ -0,0 +1,177 @@
+import argparse
+import importlib.util
+import json
+import time
+
+import numpy as np
+
+from core import GENERATION_MODES, weasel_stream
+
+BLOCK_SIZE = 1 << 16
+COLUMNS = [
+    ('generation', np.int64),
+    ('best_score', np.int32),
+    ('accuracy', np.float32),
+    ('mutations', np.int32),
+    ('wall_time', np.float64),
+]
+
+
+def default_format():
+    return 'parquet' if importlib.util.find_spec('pyarrow') is not None else 'npz'
+
+
+def _pyarrow():
+    # pyarrow takes a noticeable while to import, so only load it when a Parquet file is touched
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow; install it or use format='npz'") from None
+    return pyarrow, pyarrow.parquet
+
+
+class TrajectoryWriter:
+    def __init__(self, path, target_length, metadata=None, block_size=BLOCK_SIZE, format=None):
+        self.path = path
+        self.format = format or default_format()
+        if self.format not in ('parquet', 'npz'):
+            raise ValueError(f"unknown export format: {self.format!r}")
+        if self.format == 'parquet':
+            _pyarrow()
+        self.target_length = target_length
+        self.metadata = dict(metadata or {}, target_length=target_length)
+        self._block = np.empty(block_size, dtype=COLUMNS)
+        self._size = 0
+        self._blocks = []
+        self._writer = None
+        self.rows = 0
+
+    def _schema(self):
+        pa, _ = _pyarrow()
+        return pa.schema(
+            [(name, pa.from_numpy_dtype(dtype)) for name, dtype in COLUMNS],
+            metadata={'weasel': json.dumps(self.metadata)}
+        )
+
+    def _parquet_writer(self):
+        if self._writer is None:
+            _, pq = _pyarrow()
+            self._writer = pq.ParquetWriter(self.path, self._schema())
+        return self._writer
+
+    def append(self, generation, score, mutations, wall_time):
+        self._block[self._size] = (generation, score, score / self.target_length, mutations, wall_time)
+        self._size += 1
+        if self._size == self._block.size:
+            self.flush()
+
+    def extend(self, generations, scores, mutations, wall_times):
+        done = 0
+        while done < len(generations):
+            count = min(self._block.size - self._size, len(generations) - done)
+            block = self._block[self._size:self._size + count]
+            block['generation'] = generations[done:done + count]
+            block['best_score'] = scores[done:done + count]
+            block['accuracy'] = block['best_score'] / self.target_length
+            block['mutations'] = mutations[done:done + count]
+            block['wall_time'] = wall_times[done:done + count]
+            self._size += count
+            done += count
+            if self._size == self._block.size:
+                self.flush()
+
+    def flush(self):
+        if not self._size:
+            return
+        block = self._block[:self._size]
+        if self.format == 'parquet':
+            # One row group per block keeps the file cheap to scan column by column
+            pa, _ = _pyarrow()
+            self._parquet_writer().write_batch(
+                pa.record_batch([block[name] for name, _ in COLUMNS], schema=self._schema())
+            )
+        else:
+            self._blocks.append(block.copy())
+        self.rows += self._size
+        self._size = 0
+
+    def close(self):
+        self.flush()
+        if self.format == 'parquet':
+            self._parquet_writer().close()
+        else:
+            table = np.concatenate(self._blocks) if self._blocks else self._block[:0]
+            with open(self.path, 'wb') as stream:
+                np.savez(
+                    stream, metadata=np.array(json.dumps(self.metadata)),
+                    **{name: table[name] for name, _ in COLUMNS}
+                )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_trajectory(path):
+    if path.endswith('.parquet'):
+        _, pq = _pyarrow()
+        table = pq.read_table(path)
+        metadata = json.loads(table.schema.metadata[b'weasel'])
+        return {name: table.column(name).to_numpy() for name, _ in COLUMNS}, metadata
+    with np.load(path) as data:
+        return {name: data[name] for name, _ in COLUMNS}, json.loads(str(data['metadata']))
+
+
+def export_stream(stream, writer, elapsed=0.0):
+    start = time.perf_counter() - elapsed
+    for snapshot in stream:
+        writer.append(snapshot.generation, snapshot.score, snapshot.mutations, time.perf_counter() - start)
+        yield snapshot
+
+
+def export_run(path, target, mutation_rate=0.05, population_size=100, seed=None, max_generations=None,
+               mode='dense', format=None):
+    metadata = {
+        'target': target,
+        'mutation_rate': mutation_rate,
+        'population_size': population_size,
+        'seed': seed,
+        'mode': mode,
+    }
+    stream = weasel_stream(
+        target, mutation_rate, population_size, seed, max_generations=max_generations,
+        include_candidate=False, mode=mode
+    )
+    with TrajectoryWriter(path, len(target), metadata, format=format) as writer:
+        for snapshot in export_stream(stream, writer):
+            pass
+    return snapshot
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Weasel program and export its trajectory")
+    parser.add_argument('target')
+    parser.add_argument('output', help="destination file (.parquet or .npz)")
+    parser.add_argument('--mutation-rate', type=float, default=0.05)
+    parser.add_argument('--population-size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--max-generations', type=int, default=None)
+    parser.add_argument('--mode', choices=sorted(GENERATION_MODES), default='dense')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    format = 'npz' if args.output.endswith('.npz') else 'parquet'
+    snapshot = export_run(
+        args.output, args.target, args.mutation_rate, args.population_size, args.seed, args.max_generations,
+        args.mode, format
+    )
+    print(f"{snapshot.generation + 1} generations written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import multiprocessing as mp
+import sys
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core import GENERATION_MODES, NUM_CHARS, decode, encode, next_generation, validate_input
+
+TOPOLOGIES = ('ring', 'all', 'random')
+
+
+@dataclass
+class IslandResult:
+    target: str
+    converged: bool
+    winner: int
+    generations: int
+    best: str
+    scores: np.ndarray
+
+
+def _views(buffer, islands, length):
+    # Layout: scores | converged-at generation | stop flag | best candidates
+    header = np.ndarray((2 * islands + 1,), dtype=np.int64, buffer=buffer)
+    best = np.ndarray((islands, length), dtype=np.uint8, buffer=buffer, offset=header.nbytes)
+    return header[:islands], header[islands:2 * islands], header[2 * islands:], best
+
+
+def _shared_size(islands, length):
+    return (2 * islands + 1) * 8 + islands * length
+
+
+def _source_island(index, scores, topology, rng):
+    islands = scores.size
+    if topology == 'ring':
+        return (index - 1) % islands
+    if topology == 'all':
+        return int(np.argmax(scores))
+    others = [i for i in range(islands) if i != index]
+    return int(rng.choice(others)) if others else index
+
+
+def _island(index, name, islands, target, mutation_rate, population_size, migration_interval, topology,
+            max_generations, seed, barrier, mode):
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        scores, converged_at, stop, best = _views(memory.buf, islands, len(target))
+        rng = np.random.default_rng(seed)
+        target_codes = encode(target)
+        parent = rng.integers(0, NUM_CHARS, size=target_codes.size, dtype=np.uint8)
+        score = int(np.count_nonzero(parent == target_codes))
+        generation = 0
+        while True:
+            for _ in range(migration_interval):
+                if score == target_codes.size or generation == max_generations:
+                    break
+                parent, score, _ = next_generation(
+                    parent, score, target_codes, population_size, mutation_rate, rng, mode
+                )
+                generation += 1
+            best[index] = parent
+            scores[index] = score
+            if score == target_codes.size:
+                if converged_at[index] < 0:
+                    converged_at[index] = generation
+                stop[0] = 1
+            if generation == max_generations:
+                stop[0] = 1
+            barrier.wait()
+            if stop[0]:
+                break
+            source = _source_island(index, scores, topology, rng)
+            if scores[source] > score:
+                parent = best[source].copy()
+                score = int(scores[source])
+            # Nobody writes its slot again until every island has read
+            barrier.wait()
+    except BaseException:
+        # Release the other islands instead of leaving them on the barrier
+        barrier.abort()
+        raise
+    finally:
+        del scores, converged_at, stop, best
+        memory.close()
+
+
+def run_islands(target, islands=4, mutation_rate=0.05, population_size=100, migration_interval=20,
+                topology='ring', max_generations=100000, seed=None, mode='dense'):
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"unknown topology: {topology!r}")
+    seeds = np.random.SeedSequence(seed).spawn(islands)
+    memory = shared_memory.SharedMemory(create=True, size=_shared_size(islands, len(target)))
+    try:
+        scores, converged_at, stop, best = _views(memory.buf, islands, len(target))
+        scores[:] = -1
+        converged_at[:] = -1
+        stop[:] = 0
+        barrier = mp.Barrier(islands)
+        workers = [
+            mp.Process(target=_island, args=(
+                index, memory.name, islands, target, mutation_rate, population_size, migration_interval,
+                topology, max_generations, seeds[index], barrier, mode
+            ))
+            for index in range(islands)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        done = np.flatnonzero(converged_at >= 0)
+        if done.size:
+            winner = int(done[np.argmin(converged_at[done])])
+            generations = int(converged_at[winner])
+        else:
+            winner = int(np.argmax(scores))
+            generations = max_generations
+        result = IslandResult(target, bool(done.size), winner, generations, decode(best[winner]), scores.copy())
+        del scores, converged_at, stop, best
+        return result
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Island-model Weasel with shared-memory migration")
+    parser.add_argument('target')
+    parser.add_argument('--islands', type=int, default=mp.cpu_count())
+    parser.add_argument('--mutation-rate', type=float, default=0.05)
+    parser.add_argument('--population-size', type=int, default=100)
+    parser.add_argument('--migration-interval', type=int, default=20)
+    parser.add_argument('--topology', choices=TOPOLOGIES, default='ring')
+    parser.add_argument('--max-generations', type=int, default=100000)
+    parser.add_argument('--mode', choices=sorted(GENERATION_MODES), default='dense')
+    parser.add_argument('--seed', type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    target = args.target.lower()
+    if not validate_input(target):
+        sys.exit(f"invalid target phrase: {target!r}")
+    result = run_islands(
+        target, args.islands, args.mutation_rate, args.population_size, args.migration_interval,
+        args.topology, args.max_generations, args.seed, args.mode
+    )
+    print(f"converged: {result.converged} | island {result.winner} | generation {result.generations}")
+    print(result.best)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import sys
+
+import numpy as np
+
+from core import CODE_TABLE, NUM_CHARS, POSSIBLE_CHARS, sample_mutations
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Plain text files: fold uppercase like the app does and read any whitespace as a space
+TEXT_TABLE = CODE_TABLE.copy()
+TEXT_TABLE[np.frombuffer(POSSIBLE_CHARS.upper().encode('ascii'), dtype=np.uint8)] = \
+    CODE_TABLE[np.frombuffer(POSSIBLE_CHARS.encode('ascii'), dtype=np.uint8)]
+TEXT_TABLE[np.frombuffer(b'\t\n\v\f\r', dtype=np.uint8)] = CODE_TABLE[ord(' ')]
+
+
+def open_target(path):
+    return np.memmap(path, dtype=np.uint8, mode='r')
+
+
+def load_target(data, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    # Validate chunk by chunk and hand back the mapped bytes; runs translate only what they read
+    size = data.size
+    while size and data[size - 1] in (ord('\n'), ord('\r')):
+        size -= 1
+    if not size:
+        raise ValueError("target file is empty")
+    codes = np.empty(min(chunk_size, size), dtype=np.uint8)
+    for start in range(0, size, chunk_size):
+        end = min(start + chunk_size, size)
+        np.take(TEXT_TABLE, data[start:end], out=codes[:end - start])
+        invalid = np.flatnonzero(codes[:end - start] == 255)
+        if invalid.size:
+            offset = start + int(invalid[0])
+            raise ValueError(
+                f"invalid character {chr(data[offset])!r} at offset {offset}; use only {POSSIBLE_CHARS!r}"
+            )
+        if progress is not None:
+            progress(end, size)
+    return data[:size]
+
+
+class LongTargetRun:
+    def __init__(self, target, mutation_rate=0.05, population_size=100, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.target = target
+        self.mutation_rate = mutation_rate
+        self.population_size = population_size
+        self.chunk_size = chunk_size
+        self.rng = np.random.default_rng(seed)
+        self.generation = 0
+        self.best = np.empty(target.size, dtype=np.uint8)
+        for start in range(0, target.size, chunk_size):
+            end = min(start + chunk_size, target.size)
+            self.best[start:end] = self.rng.integers(0, NUM_CHARS, size=end - start, dtype=np.uint8)
+        self.chunk_lengths = np.diff(np.append(np.arange(0, target.size, chunk_size), target.size))
+        self.chunk_scores = np.array([
+            np.count_nonzero(self.best[start:start + chunk_size] == TEXT_TABLE[target[start:start + chunk_size]])
+            for start in range(0, target.size, chunk_size)
+        ], dtype=np.int64)
+
+    @property
+    def score(self):
+        return int(self.chunk_scores.sum())
+
+    @property
+    def converged(self):
+        return self.score == self.target.size
+
+    def chunk_accuracy(self):
+        return self.chunk_scores / np.maximum(self.chunk_lengths, 1)
+
+    def step(self):
+        # Sparse offspring: only the mutated positions are ever materialized
+        rows, positions, chars, _ = sample_mutations(
+            self.population_size, self.target.size, self.mutation_rate, self.rng
+        )
+        target_chars = TEXT_TABLE[self.target[positions]]
+        delta = (chars == target_chars).astype(np.int64) - (self.best[positions] == target_chars)
+        gains = np.bincount(rows, weights=delta, minlength=self.population_size)
+        winner = int(np.argmax(gains))
+        selected = rows == winner
+        positions, delta = positions[selected], delta[selected]
+        self.best[positions] = chars[selected]
+        self.chunk_scores += np.bincount(
+            positions // self.chunk_size, weights=delta, minlength=self.chunk_scores.size
+        ).astype(np.int64)
+        self.generation += 1
+
+    def run(self, max_generations=None, report_every=1000):
+        while not self.converged and self.generation != max_generations:
+            self.step()
+            if self.generation % report_every == 0:
+                yield self.generation, self.chunk_accuracy()
+        if self.generation % report_every:
+            yield self.generation, self.chunk_accuracy()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Weasel run against a memory-mapped target file")
+    parser.add_argument('path')
+    parser.add_argument('--mutation-rate', type=float, default=0.001)
+    parser.add_argument('--population-size', type=int, default=100)
+    parser.add_argument('--max-generations', type=int, default=None)
+    parser.add_argument('--report-every', type=int, default=1000)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--seed', type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        data = open_target(args.path)
+        target = load_target(
+            data, args.chunk_size,
+            lambda done, total: print(f"validated {done}/{total} bytes", file=sys.stderr)
+        )
+    except ValueError as error:
+        sys.exit(str(error))
+    run = LongTargetRun(target, args.mutation_rate, args.population_size, args.seed, args.chunk_size)
+    for generation, accuracy in run.run(args.max_generations, args.report_every):
+        chunks = ' '.join(f"{value * 100:.1f}" for value in accuracy)
+        print(f"generation {generation}: {run.score}/{target.size} | chunks % {chunks}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+
+def idle_run(app_test):
+    start = time.perf_counter()
+    app_test.run()
+    seconds = time.perf_counter() - start
+    if app_test.exception or not app_test.info:
+        raise RuntimeError(f"app did not reach the idle info_message state: {app_test.exception}")
+    return seconds
+
+
+def measure_warm(runs):
+    from streamlit.testing.v1 import AppTest
+
+    app_test = AppTest.from_file(APP_PATH, default_timeout=60)
+    first = idle_run(app_test)
+    # Widget interactions rerun the whole script with every module already imported
+    return first, [idle_run(app_test) for _ in range(runs)]
+
+
+def measure_cold(runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child'],
+            check=True, capture_output=True, text=True
+        ).stdout
+        samples.append(float(output.split()[-1]))
+    return samples
+
+
+def describe(label, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+    print(
+        f"{label:<10}{1000 * statistics.median(samples):>10.1f} ms median"
+        f"{1000 * p95:>10.1f} ms p95  ({len(samples)} runs)"
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure script-run latency of the idle Weasel page")
+    parser.add_argument('--runs', type=int, default=20, help="warm reruns in one process")
+    parser.add_argument('--cold', type=int, default=5, help="fresh interpreter runs, imports included")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        start = time.perf_counter()
+        from streamlit.testing.v1 import AppTest
+        idle_run(AppTest.from_file(APP_PATH, default_timeout=60))
+        print(time.perf_counter() - start)
+        return
+    if args.cold:
+        describe('cold', measure_cold(args.cold))
+    first, warm = measure_warm(args.runs)
+    describe('first', [first])
+    describe('rerun', warm)
+
+
+if __name__ == "__main__":
+    main()
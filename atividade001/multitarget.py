@@ -0,0 +1,254 @@
+import argparse
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from core import CODE_TABLE, NUM_CHARS, POSSIBLE_CHARS, decode, sample_mutations, validate_input
+
+TOP_CANDIDATES = 8
+SPACE = CODE_TABLE[ord(' ')]
+
+
+def load_phrases(path):
+    phrases = []
+    seen = set()
+    skipped = 0
+    with open(path, encoding='utf-8') as stream:
+        for line in stream:
+            phrase = line.strip().lower()
+            if not phrase or phrase in seen:
+                continue
+            if not validate_input(phrase):
+                skipped += 1
+                continue
+            seen.add(phrase)
+            phrases.append(phrase)
+    return phrases, skipped
+
+
+class TargetIndex:
+    def __init__(self, phrases):
+        if not phrases:
+            raise ValueError("need at least one target phrase")
+        self.phrases = list(phrases)
+        self.lengths = np.array([len(phrase) for phrase in self.phrases], dtype=np.int64)
+        self.length = int(self.lengths.max())
+        # Shorter targets count as padded with spaces, so a candidate has to reproduce those too
+        padded = ''.join(phrase.ljust(self.length) for phrase in self.phrases).encode('ascii', errors='replace')
+        self.codes = CODE_TABLE[np.frombuffer(padded, dtype=np.uint8)].reshape(len(self.phrases), self.length)
+        invalid = np.flatnonzero((self.codes == 255).any(axis=1))
+        if invalid.size:
+            raise ValueError(f"target #{invalid[0]} {self.phrases[invalid[0]]!r} has characters outside {POSSIBLE_CHARS!r}")
+        # The padding is left out of the postings: it would put most targets under every late (position, ' ')
+        real = np.arange(self.length) < self.lengths[:, None]
+        keys = (np.arange(self.length) * NUM_CHARS + self.codes)[real]
+        self.ids = np.flatnonzero(real)[np.argsort(keys, kind='stable')] // self.length
+        counts = np.bincount(keys, minlength=self.length * NUM_CHARS)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        # Targets of one length share their padding, so it is scored once per length bucket
+        self.bucket_lengths, self.buckets = np.unique(self.lengths, return_inverse=True)
+        self.members = np.argsort(self.buckets, kind='stable')
+        self.bucket_offsets = np.concatenate(([0], np.cumsum(np.bincount(self.buckets))))
+
+    def __len__(self):
+        return len(self.phrases)
+
+    @property
+    def num_buckets(self):
+        return self.bucket_lengths.size
+
+    def postings(self, positions, chars):
+        # Targets holding chars[i] at positions[i], as (i, target id) pairs
+        keys = positions * NUM_CHARS + chars
+        starts = self.offsets[keys]
+        lengths = self.offsets[keys + 1] - starts
+        owners = np.repeat(np.arange(keys.size), lengths)
+        within = np.arange(owners.size) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return owners, self.ids[np.repeat(starts, lengths) + within]
+
+    def padding(self, candidate):
+        # Spaces the candidate holds past each bucket's length
+        spaces = np.cumsum((candidate == SPACE)[::-1])[::-1]
+        return np.append(spaces, 0)[self.bucket_lengths]
+
+    def matches(self, candidate):
+        _, ids = self.postings(np.arange(self.length), candidate.astype(np.int64))
+        return np.bincount(ids, minlength=len(self)).astype(np.int64)
+
+    def scores(self, candidate):
+        return self.matches(candidate) + self.padding(candidate)[self.buckets]
+
+
+@dataclass
+class MultiTargetSnapshot:
+    generation: int
+    score: int
+    nearest: int
+    codes: np.ndarray = None
+
+    @property
+    def candidate(self):
+        return None if self.codes is None else decode(self.codes)
+
+
+@dataclass
+class MultiTargetResult:
+    phrase: str
+    index: int
+    score: int
+    generations: int
+    converged: bool
+    candidate: str
+
+
+def _mutation_deltas(index, parent, rows, positions, chars):
+    # Per (child, target) score change, summed over each child's mutations
+    changed = chars != parent[positions]
+    rows, positions, chars = rows[changed], positions[changed], chars[changed].astype(np.int64)
+    gained, gained_ids = index.postings(positions, chars)
+    lost, lost_ids = index.postings(positions, parent[positions].astype(np.int64))
+    keys = np.concatenate((rows[gained] * len(index) + gained_ids, rows[lost] * len(index) + lost_ids))
+    weights = np.concatenate((np.ones(gained.size, dtype=np.int64), -np.ones(lost.size, dtype=np.int64)))
+    order = np.argsort(keys, kind='stable')
+    keys, weights = keys[order], weights[order]
+    if not keys.size:
+        return keys, weights
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    return keys[starts], np.add.reduceat(weights, starts)
+
+
+def _bucket_leaders(index, matches):
+    # The best few targets of each length bucket, best first; -1 fills buckets with fewer members
+    leaders = np.full((index.num_buckets, TOP_CANDIDATES), -1, dtype=np.int64)
+    for bucket in range(index.num_buckets):
+        members = index.members[index.bucket_offsets[bucket]:index.bucket_offsets[bucket + 1]]
+        if members.size > TOP_CANDIDATES:
+            members = members[np.argpartition(matches[members], -TOP_CANDIDATES)[-TOP_CANDIDATES:]]
+        members = members[np.argsort(-matches[members], kind='stable')]
+        leaders[bucket, :members.size] = members
+    return leaders
+
+
+def multitarget_generation(index, parent, parent_matches, population_size=100, mutation_rate=0.05, rng=None):
+    targets, buckets = len(index), index.num_buckets
+    rows, positions, chars, _ = sample_mutations(population_size, index.length, mutation_rate, rng)
+    keys, deltas = _mutation_deltas(index, parent, rows, positions, chars)
+    touched_rows, touched_ids = keys // targets, keys % targets
+
+    # A space written or overwritten at position p moves the padding score of every bucket no longer than p
+    shift = (chars == SPACE).astype(np.int64) - (parent[positions] == SPACE)
+    moved = shift != 0
+    steps = np.zeros((population_size, buckets + 1), dtype=np.int64)
+    np.add.at(steps, (rows[moved], 0), shift[moved])
+    np.add.at(steps, (rows[moved], np.searchsorted(index.bucket_lengths, positions[moved], side='right')), -shift[moved])
+    padding = index.padding(parent) + np.cumsum(steps, axis=1)[:, :buckets]
+    values = parent_matches[touched_ids] + deltas + padding[touched_rows, index.buckets[touched_ids]]
+
+    best = np.full(population_size, -1, dtype=np.int64)
+    nearest = np.zeros(population_size, dtype=np.int64)
+    if keys.size:
+        np.maximum.at(best, touched_rows, values)
+        hit = values == best[touched_rows]
+        nearest[touched_rows[hit]] = touched_ids[hit]
+
+    # Targets a child did not touch keep the parent's matches; check each bucket's leaders first
+    leaders = _bucket_leaders(index, parent_matches)
+    lookup = np.arange(population_size)[:, None, None] * targets + leaders
+    found = np.searchsorted(keys, lookup)
+    untouched = found >= keys.size
+    if keys.size:
+        untouched |= keys[np.minimum(found, keys.size - 1)] != lookup
+    untouched &= leaders >= 0
+    first = np.argmax(untouched, axis=2)
+    has_untouched = np.take_along_axis(untouched, first[..., None], axis=2)[..., 0]
+    leader = leaders[np.arange(buckets), first]
+    fallback = np.where(has_untouched, parent_matches[leader] + padding, -1)
+    column = np.argmax(fallback, axis=1)
+    fallback = fallback[np.arange(population_size), column]
+    better = fallback > best
+    best[better] = fallback[better]
+    nearest[better] = leader[better, column[better]]
+    exhausted = ~has_untouched & (np.diff(index.bucket_offsets) > TOP_CANDIDATES)
+    for row, bucket in zip(*np.nonzero(exhausted)):
+        # Every leader of this bucket was touched; scan the rest of the bucket for this child
+        members = index.members[index.bucket_offsets[bucket]:index.bucket_offsets[bucket + 1]]
+        start, stop = np.searchsorted(keys, [row * targets, (row + 1) * targets])
+        members = members[~np.isin(members, touched_ids[start:stop], assume_unique=True)]
+        if members.size:
+            top = members[np.argmax(parent_matches[members])]
+            if parent_matches[top] + padding[row, bucket] > best[row]:
+                best[row], nearest[row] = parent_matches[top] + padding[row, bucket], top
+
+    winner = int(np.argmax(best))
+    selected = rows == winner
+    child = parent.copy()
+    child[positions[selected]] = chars[selected]
+    child_matches = parent_matches.copy()
+    in_row = touched_rows == winner
+    child_matches[touched_ids[in_row]] += deltas[in_row]
+    return child, child_matches, int(best[winner]), int(nearest[winner])
+
+
+def multitarget_stream(index, mutation_rate=0.05, population_size=100, seed=None, every=1, max_generations=None,
+                       include_candidate=True):
+    rng = np.random.default_rng(seed)
+    every = max(int(every), 1)
+    parent = rng.integers(0, NUM_CHARS, size=index.length, dtype=np.uint8)
+    parent_matches = index.matches(parent)
+    scores = parent_matches + index.padding(parent)[index.buckets]
+    nearest = int(np.argmax(scores))
+    score = int(scores[nearest])
+    generation = 0
+    while True:
+        done = score == index.length or generation == max_generations
+        if done or generation % every == 0:
+            yield MultiTargetSnapshot(generation, score, nearest, parent if include_candidate else None)
+        if done:
+            return
+        generation += 1
+        parent, parent_matches, score, nearest = multitarget_generation(
+            index, parent, parent_matches, population_size, mutation_rate, rng
+        )
+
+
+def search(phrases, mutation_rate=0.05, population_size=100, seed=None, max_generations=100000):
+    index = phrases if isinstance(phrases, TargetIndex) else TargetIndex(phrases)
+    for snapshot in multitarget_stream(index, mutation_rate, population_size, seed, 1, max_generations):
+        pass
+    return MultiTargetResult(
+        index.phrases[snapshot.nearest], snapshot.nearest, snapshot.score, snapshot.generation,
+        snapshot.score == index.length, snapshot.candidate
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Evolve toward the nearest phrase of a dictionary")
+    parser.add_argument('phrases', help="text file with one target phrase per line")
+    parser.add_argument('--mutation-rate', type=float, default=0.05)
+    parser.add_argument('--population-size', type=int, default=100)
+    parser.add_argument('--max-generations', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--report-every', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    phrases, skipped = load_phrases(args.phrases)
+    if skipped:
+        print(f"skipped {skipped} line(s) with invalid characters", file=sys.stderr)
+    index = TargetIndex(phrases)
+    print(f"{len(index)} targets, padded to {index.length} characters", file=sys.stderr)
+    stream = multitarget_stream(
+        index, args.mutation_rate, args.population_size, args.seed, args.report_every or 1, args.max_generations
+    )
+    for snapshot in stream:
+        if args.report_every:
+            print(f"{snapshot.generation:>8}  {snapshot.score:>4}/{index.length}  {snapshot.candidate!r}", file=sys.stderr)
+    status = 'reached' if snapshot.score == index.length else 'closest to'
+    print(f"{status} target #{snapshot.nearest} {index.phrases[snapshot.nearest]!r} after {snapshot.generation} generations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import numpy as np
+
+from core import NUM_CHARS, Snapshot, bernoulli_indices, encode
+
+BITS = 6
+SYMBOLS_PER_WORD = 64 // BITS
+FIELD_MASK = np.uint64((1 << BITS) - 1)
+# Lowest bit of every 6-bit field in a word
+LOW_BITS = np.uint64(sum(1 << (BITS * i) for i in range(SYMBOLS_PER_WORD)))
+SHIFTS = (np.arange(SYMBOLS_PER_WORD, dtype=np.uint64) * np.uint64(BITS))
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(words):
+        return np.bitwise_count(words)
+else:
+    _BYTE_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        counts = _BYTE_COUNTS[words.view(np.uint8)].reshape(*words.shape, 8)
+        return counts.sum(axis=-1, dtype=np.uint8)
+
+
+def word_count(length):
+    return -(-length // SYMBOLS_PER_WORD)
+
+
+def pack(codes):
+    codes = np.asarray(codes, dtype=np.uint8)
+    width = word_count(codes.shape[-1]) * SYMBOLS_PER_WORD
+    padded = np.zeros((*codes.shape[:-1], width), dtype=np.uint64)
+    padded[..., :codes.shape[-1]] = codes
+    fields = padded.reshape(*codes.shape[:-1], -1, SYMBOLS_PER_WORD) << SHIFTS
+    return np.bitwise_or.reduce(fields, axis=-1)
+
+
+def unpack(words, length):
+    fields = (words[..., None] >> SHIFTS) & FIELD_MASK
+    return fields.reshape(*words.shape[:-1], -1)[..., :length].astype(np.uint8)
+
+
+def mismatches(words, target_words):
+    # Fold each 6-bit field of the XOR onto its lowest bit, then popcount
+    diff = words ^ target_words
+    diff |= diff >> np.uint64(1)
+    diff |= diff >> np.uint64(2)
+    diff |= diff >> np.uint64(2)
+    return popcount(diff & LOW_BITS).sum(axis=-1, dtype=np.int64)
+
+
+def packed_scores(words, target_words, length):
+    return length - mismatches(words, target_words)
+
+
+def write_symbols(words, rows, positions, chars):
+    # ufunc.at handles several positions landing in the same word
+    index = (rows, positions // SYMBOLS_PER_WORD)
+    shifts = (positions % SYMBOLS_PER_WORD).astype(np.uint64) * np.uint64(BITS)
+    np.bitwise_and.at(words, index, ~(FIELD_MASK << shifts))
+    np.bitwise_or.at(words, index, chars.astype(np.uint64) << shifts)
+
+
+def read_symbols(words, positions):
+    shifts = (positions % SYMBOLS_PER_WORD).astype(np.uint64) * np.uint64(BITS)
+    return (words[positions // SYMBOLS_PER_WORD] >> shifts) & FIELD_MASK
+
+
+def packed_generation(parent, target, length, population_size=100, mutation_rate=0.05, rng=None,
+                      max_words=1 << 22):
+    rng = np.random.default_rng(rng)
+    rows_per_chunk = max(1, max_words // max(parent.size, 1))
+    best_score, best_child, best_mutations = -1, parent, 0
+    for start in range(0, population_size, rows_per_chunk):
+        rows = min(rows_per_chunk, population_size - start)
+        children = np.broadcast_to(parent, (rows, parent.size)).copy()
+        hits = bernoulli_indices(rows * length, mutation_rate, rng)
+        chars = rng.integers(0, NUM_CHARS, size=hits.size, dtype=np.uint8)
+        write_symbols(children, hits // length, hits % length, chars)
+        scores = packed_scores(children, target, length)
+        best = int(np.argmax(scores))
+        if scores[best] > best_score:
+            best_score, best_child = int(scores[best]), children[best].copy()
+            positions = hits[hits // length == best] % length
+            best_mutations = int(np.count_nonzero(read_symbols(parent, positions) != read_symbols(best_child, positions)))
+    return best_child, best_score, best_mutations
+
+
+def packed_stream(target, mutation_rate=0.05, population_size=100, seed=None, every=1, max_generations=None,
+                  include_candidate=True, max_words=1 << 22):
+    rng = np.random.default_rng(seed)
+    target_codes = encode(target) if isinstance(target, str) else target
+    length = target_codes.size
+    target_words = pack(target_codes)
+    parent = pack(rng.integers(0, NUM_CHARS, size=length, dtype=np.uint8))
+    score = int(packed_scores(parent, target_words, length))
+    every = max(int(every), 1)
+    generation = 0
+    mutations = 0
+    done = score == length or max_generations == 0
+    while True:
+        if done or generation % every == 0:
+            yield Snapshot(generation, score, unpack(parent, length) if include_candidate else None, mutations)
+        if done:
+            return
+        generation += 1
+        parent, score, mutations = packed_generation(
+            parent, target_words, length, population_size, mutation_rate, rng, max_words
+        )
+        done = score == length or generation == max_generations
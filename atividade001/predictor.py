@@ -0,0 +1,145 @@
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from core import NUM_CHARS, evolve_batch, generate_random_phrase
+
+
+# Beyond this many expected generations a run is treated as never converging
+MAX_EXPECTED = 1e7
+MAX_DOUBLINGS = 40
+
+
+@dataclass
+class Prediction:
+    length: int
+    mutation_rate: float
+    population_size: int
+    expected: float
+    variance: float
+    start: np.ndarray = field(default=None, repr=False)
+    transient: np.ndarray = field(default=None, repr=False)
+    _powers: list = field(default_factory=list, repr=False)
+
+    @property
+    def converges(self):
+        return bool(np.isfinite(self.expected))
+
+    @property
+    def std(self):
+        return float(np.sqrt(max(self.variance, 0.0)))
+
+    def _power(self, k):
+        # transient ** (2 ** k), squared on demand and kept for later quantiles
+        if not self._powers:
+            self._powers.append(self.transient)
+        while len(self._powers) <= k:
+            self._powers.append(self._powers[-1] @ self._powers[-1])
+        return self._powers[k]
+
+    def quantile(self, q):
+        # Smallest generation by which the run has converged with probability q, by binary lifting
+        if not self.converges:
+            return None
+        state = self.start[:self.length]
+        survival = 1 - q
+        if state.sum() <= survival:
+            return 0
+        top = 0
+        while (state @ self._power(top)).sum() > survival:
+            top += 1
+            if top > MAX_DOUBLINGS:
+                return None
+        generations = 0
+        for k in range(top, -1, -1):
+            moved = state @ self._power(k)
+            if moved.sum() > survival:
+                state = moved
+                generations += 1 << k
+        return generations + 1
+
+
+def binomial_pmf(n, p):
+    k = np.arange(n + 1)
+    log_fact = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, n + 1)))))
+    with np.errstate(divide='ignore'):
+        log_pmf = log_fact[n] - log_fact[k] - log_fact[n - k] + k * np.log(p) + (n - k) * np.log1p(-p)
+    if p == 0.0:
+        log_pmf = np.where(k == 0, 0.0, -np.inf)
+    elif p == 1.0:
+        log_pmf = np.where(k == n, 0.0, -np.inf)
+    return np.exp(log_pmf)
+
+
+def transition_matrix(length, mutation_rate, population_size, num_chars=NUM_CHARS):
+    # State = number of matching characters in the current best candidate
+    lose = mutation_rate * (num_chars - 1) / num_chars
+    gain = mutation_rate / num_chars
+    matrix = np.zeros((length + 1, length + 1))
+    for matched in range(length + 1):
+        child = np.convolve(binomial_pmf(matched, 1 - lose), binomial_pmf(length - matched, gain))
+        cdf = np.minimum(np.cumsum(child), 1.0)
+        best = cdf ** population_size
+        matrix[matched] = np.diff(best, prepend=0.0)
+    matrix[length] = 0.0
+    matrix[length, length] = 1.0
+    return matrix
+
+
+def predict(length, mutation_rate, population_size, num_chars=NUM_CHARS):
+    matrix = transition_matrix(length, mutation_rate, population_size, num_chars)
+    start = binomial_pmf(length, 1 / num_chars)
+
+    transient = matrix[:length, :length]
+    fundamental = np.eye(length) - transient
+    with np.errstate(all='ignore'):
+        times = np.linalg.solve(fundamental, np.ones(length))
+        second = np.linalg.solve(fundamental, 1 + 2 * transient @ times)
+    expected = float(start[:length] @ times)
+    variance = float(start[:length] @ second) - expected ** 2
+    # Near-certain non-convergence makes the system singular; solve then returns garbage, often negative
+    if not np.all(np.isfinite(times)) or times.min() < 1 - 1e-6 or not expected <= MAX_EXPECTED:
+        expected = variance = float('inf')
+    return Prediction(length, mutation_rate, population_size, expected, variance, start, transient)
+
+
+def compare_with_simulation(length, mutation_rate, population_size, runs=1000, seed=None):
+    prediction = predict(length, mutation_rate, population_size)
+    result = evolve_batch(generate_random_phrase(length), mutation_rate, population_size, runs, seed=seed)
+    stats = result.stats()
+    return {
+        'predicted_mean': prediction.expected,
+        'predicted_std': prediction.std,
+        'predicted_median': prediction.quantile(0.5),
+        'simulated_mean': stats['mean'],
+        'simulated_std': stats['std'],
+        'simulated_median': stats['median'],
+        # Standard error of the simulated mean, for judging the gap
+        'standard_error': prediction.std / float(np.sqrt(max(stats['converged'], 1))),
+    }
+
+
+def check_against_simulation(length, mutation_rate, population_size, runs=2000, seed=0, sigmas=4.0):
+    comparison = compare_with_simulation(length, mutation_rate, population_size, runs, seed)
+    gap = abs(comparison['predicted_mean'] - comparison['simulated_mean'])
+    assert gap <= sigmas * comparison['standard_error'], (
+        f"L={length} rate={mutation_rate} population={population_size}: predicted mean "
+        f"{comparison['predicted_mean']:.2f} is {gap / comparison['standard_error']:.1f} standard errors "
+        f"from the simulated {comparison['simulated_mean']:.2f}"
+    )
+    return comparison
+
+
+VALIDATION_CASES = [(11, 0.05, 100), (28, 0.05, 100), (28, 0.02, 50), (28, 0.1, 500)]
+
+
+if __name__ == "__main__":
+    failures = 0
+    for length, rate, size in VALIDATION_CASES:
+        try:
+            print(length, rate, size, check_against_simulation(length, rate, size))
+        except AssertionError as error:
+            print(f"FAIL {error}", file=sys.stderr)
+            failures += 1
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,72 @@
+import csv
+import io
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+SLEEP_PHASE = 'sleep'
+
+
+class PhaseProfiler:
+    def __init__(self, window=200, trace_size=100000):
+        self.window = window
+        self._timings = {}
+        self._trace = deque(maxlen=trace_size)
+        self._origin = time.perf_counter()
+        self.frame = 0
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start)
+
+    def record(self, name, start, seconds):
+        if name not in self._timings:
+            self._timings[name] = deque(maxlen=self.window)
+        self._timings[name].append(seconds)
+        self._trace.append((self.frame, name, start - self._origin, seconds))
+
+    def next_frame(self):
+        self.frame += 1
+
+    def summary(self):
+        rows = []
+        totals = {name: sum(values) for name, values in self._timings.items()}
+        frame_total = sum(totals.values()) or 1.0
+        for name, values in self._timings.items():
+            samples = np.fromiter(values, dtype=np.float64)
+            rows.append({
+                'phase': name,
+                'mean_ms': 1000 * samples.mean(),
+                'p95_ms': 1000 * np.percentile(samples, 95),
+                'share_%': 100 * totals[name] / frame_total,
+            })
+        return rows
+
+    def render_share(self):
+        totals = {name: sum(values) for name, values in self._timings.items()}
+        busy = sum(value for name, value in totals.items() if name != SLEEP_PHASE)
+        total = busy + totals.get(SLEEP_PHASE, 0.0)
+        return busy / total if total else 0.0
+
+    def export_csv(self):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['frame', 'phase', 'start_s', 'duration_s'])
+        writer.writerows(self._trace)
+        return buffer.getvalue()
+
+
+class NullProfiler:
+    frame = 0
+
+    def phase(self, name):
+        return nullcontext()
+
+    def next_frame(self):
+        pass
@@ -0,0 +1,39 @@
+import numpy as np
+
+
+class HighlightRenderer:
+    def __init__(self, target, matched='{text}', unmatched='<span style="color: #dc3545;">{text}</span>', block_size=64):
+        self.target = np.frombuffer(target.encode('ascii'), dtype=np.uint8)
+        self.matched = matched
+        self.unmatched = unmatched
+        self.block_size = block_size
+        self._starts = np.arange(0, self.target.size, block_size)
+        self._previous = None
+        self._blocks = [''] * self._starts.size
+
+    def _render_block(self, text, mask):
+        # One span per run of equal match state
+        cuts = np.flatnonzero(mask[1:] != mask[:-1]) + 1
+        bounds = [0, *cuts.tolist(), mask.size]
+        parts = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            template = self.matched if mask[start] else self.unmatched
+            parts.append(template.format(text=text[start:end]))
+        return ''.join(parts)
+
+    def render(self, candidate):
+        codes = np.frombuffer(candidate.encode('ascii'), dtype=np.uint8)
+        if not self._starts.size:
+            return ''
+        if self._previous is None:
+            changed = range(self._starts.size)
+        else:
+            changed = np.flatnonzero(np.logical_or.reduceat(codes != self._previous, self._starts)).tolist()
+        if changed:
+            mask = codes == self.target
+            for block in changed:
+                start = block * self.block_size
+                end = start + self.block_size
+                self._blocks[block] = self._render_block(candidate[start:end], mask[start:end])
+        self._previous = codes
+        return ''.join(self._blocks)
@@ -0,0 +1,272 @@
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from checkpoint import load_checkpoint, resumable_run
+from core import Trajectory, decode, weasel_stream
+from export import TrajectoryWriter, export_stream
+from telemetry import Telemetry
+from worker import WorkerSnapshot
+
+PUBLISH_INTERVAL = 0.1
+ABANDON_AFTER = 30.0
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+def _run_job(params, updates, cancel, publish_interval=PUBLISH_INTERVAL):
+    target = params['target']
+    state_path = params.get('state_path')
+    pending = []
+    elapsed = 0.0
+    resumed_at = 0
+    if state_path is not None and os.path.exists(state_path):
+        # The resumed stream starts at the saved generation, so replay the history before it
+        state = load_checkpoint(state_path)
+        pending, elapsed, resumed_at = state.scores[:-1].tolist(), state.elapsed, state.generation
+    max_generations = params.get('max_generations')
+    if state_path is not None:
+        stream = resumable_run(
+            state_path, target, params['mutation_rate'], params['population_size'], params.get('seed'),
+            params.get('mode', 'dense'), params.get('state_interval', 30.0), max_generations
+        )
+    else:
+        stream = weasel_stream(
+            target, params['mutation_rate'], params['population_size'], params.get('seed'),
+            mode=params.get('mode', 'dense'), max_generations=max_generations
+        )
+    source = stream
+    writer = None
+    if params.get('export_path') is not None:
+        metadata = {key: params.get(key) for key in ('target', 'mutation_rate', 'population_size', 'seed')}
+        metadata['mode'] = params.get('mode', 'dense')
+        metadata['resumed_at'] = resumed_at
+        metadata['resumed_elapsed'] = elapsed
+        writer = TrajectoryWriter(params['export_path'], len(target), metadata)
+        # Generations from before a resume have no mutation counts or timings, only scores
+        writer.extend(np.arange(resumed_at), pending, np.full(resumed_at, -1), np.full(resumed_at, np.nan))
+        stream = export_stream(stream, writer, elapsed)
+    checkpoint_every = params.get('checkpoint_every', 0)
+    checkpoints = deque(maxlen=params.get('history_size'))
+    start = time.perf_counter() - elapsed
+    published_at = 0.0
+    snapshot = None
+    for snapshot in stream:
+        pending.append(snapshot.score)
+        if checkpoint_every and snapshot.generation % checkpoint_every == 0:
+            checkpoints.append((snapshot.generation, snapshot.candidate))
+        finished = snapshot.score == len(target) or snapshot.generation == max_generations
+        now = time.perf_counter()
+        cancelled = False
+        if finished or now - published_at >= publish_interval:
+            # The cancel flag is a manager round trip, so it is only read as often as progress is sent
+            cancelled = cancel.is_set()
+            # Scores travel in batches; the candidate only as of the latest generation
+            updates.put((
+                snapshot.generation, snapshot.score, snapshot.codes.tobytes(), now - start,
+                np.array(pending, dtype=np.int32).tobytes(), list(checkpoints)
+            ))
+            pending = []
+            checkpoints.clear()
+            published_at = now
+        if cancelled:
+            break
+    # Closing the source right away makes a resumable run save its state before the job returns
+    source.close()
+    if writer is not None:
+        writer.close()
+    if state_path is not None and snapshot is not None and snapshot.score == len(target) and os.path.exists(state_path):
+        os.remove(state_path)
+    updates.put(None)
+
+
+class JobHandle:
+    def __init__(self, job_id, session_id, params, updates, cancel, scheduler):
+        self.job_id = job_id
+        self.session_id = session_id
+        self.params = params
+        self.target = params['target']
+        self.telemetry = Telemetry()
+        # Only the newest candidates are kept; replay shows no more than these
+        self._history = deque(maxlen=params.get('history_size'))
+        self.future = None
+        self._updates = updates
+        self._cancel = cancel
+        self._scheduler = scheduler
+        self._latest = None
+        self._finished = False
+        self._cancelled = False
+        self._abandoned = False
+        self.last_seen = time.monotonic()
+
+    def start(self):
+        pass
+
+    def stop(self):
+        self._scheduler.cancel(self)
+
+    def _drain(self):
+        self.last_seen = time.monotonic()
+        while not self._finished:
+            try:
+                update = self._updates.get_nowait()
+            except queue.Empty:
+                break
+            if update is None:
+                self._finished = True
+                break
+            generation, score, codes, elapsed, scores, checkpoints = update
+            self.telemetry.extend(np.frombuffer(scores, dtype=np.int32))
+            self._history.extend(checkpoints)
+            self._latest = (generation, score, codes, elapsed)
+        if self.future is not None and self.future.done() and self.future.exception() is not None:
+            self._finished = True
+
+    @property
+    def checkpoints(self):
+        return dict(self._history)
+
+    @property
+    def error(self):
+        if self.future is None or not self.future.done() or self.future.cancelled():
+            return None
+        return self.future.exception()
+
+    @property
+    def queued(self):
+        return self.future is None and not self._finished
+
+    @property
+    def done(self):
+        self._drain()
+        return self._finished
+
+    @property
+    def converged(self):
+        self._drain()
+        return self._latest is not None and self._latest[1] == len(self.target)
+
+    def snapshot(self):
+        self._drain()
+        if self._latest is None:
+            return WorkerSnapshot(0, 0, None, 0.0, self._finished)
+        generation, score, codes, elapsed = self._latest
+        return WorkerSnapshot(generation, score, decode(np.frombuffer(codes, dtype=np.uint8)), elapsed, self._finished)
+
+    def trajectory(self):
+        snapshot = self.snapshot()
+        checkpoints = dict(self.checkpoints)
+        checkpoints[snapshot.generation] = snapshot.candidate
+        return Trajectory(self.target, self.telemetry.scores.copy(), checkpoints, self.converged)
+
+
+class JobScheduler:
+    def __init__(self, max_workers=None, session_quota=2, abandon_after=ABANDON_AFTER):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.session_quota = session_quota
+        self.abandon_after = abandon_after
+        context = mp.get_context('spawn')
+        self._manager = context.Manager()
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        self._lock = threading.Lock()
+        self._queues = OrderedDict()
+        self._running = set()
+        self._ids = itertools.count(1)
+        self._closing = threading.Event()
+        if abandon_after:
+            threading.Thread(target=self._reap, daemon=True).start()
+
+    def submit(self, session_id, params):
+        with self._lock:
+            active = sum(1 for job in self._running if job.session_id == session_id)
+            active += len(self._queues.get(session_id, ()))
+            if active >= self.session_quota:
+                raise QuotaExceeded(f"session already has {active} active jobs")
+            job = JobHandle(
+                next(self._ids), session_id, params, self._manager.Queue(), self._manager.Event(), self
+            )
+            self._queues.setdefault(session_id, deque()).append(job)
+            self._dispatch()
+        return job
+
+    def cancel(self, job):
+        with self._lock:
+            job._cancelled = True
+            jobs = self._queues.get(job.session_id)
+            if jobs is not None and job in jobs:
+                jobs.remove(job)
+                job._updates.put(None)
+            else:
+                job._cancel.set()
+
+    def cancel_session(self, session_id):
+        with self._lock:
+            jobs = [job for job in self._running if job.session_id == session_id]
+            jobs += list(self._queues.get(session_id, ()))
+        for job in jobs:
+            self.cancel(job)
+
+    def _reap(self):
+        # A session that closed or reloaded stops polling its handle; free its slot instead of running on
+        while not self._closing.wait(self.abandon_after / 3):
+            now = time.monotonic()
+            with self._lock:
+                jobs = list(self._running) + [job for jobs in self._queues.values() for job in jobs]
+            for job in jobs:
+                if not job._cancelled and now - job.last_seen > self.abandon_after:
+                    job._abandoned = True
+                    self.cancel(job)
+
+    def _finished(self, job, future):
+        export_path = job.params.get('export_path')
+        if job._abandoned and export_path is not None and os.path.exists(export_path):
+            # Nobody is left to download it
+            os.remove(export_path)
+        with self._lock:
+            self._running.discard(job)
+            self._dispatch()
+
+    def _dispatch(self):
+        # Round-robin over sessions: one job from each waiting session per turn
+        while len(self._running) < self.max_workers and self._queues:
+            session_id, jobs = next(iter(self._queues.items()))
+            self._queues.move_to_end(session_id)
+            if not jobs:
+                del self._queues[session_id]
+                continue
+            job = jobs.popleft()
+            if not jobs:
+                del self._queues[session_id]
+            self._running.add(job)
+            job.future = self._pool.submit(_run_job, job.params, job._updates, job._cancel)
+            job.future.add_done_callback(lambda future, job=job: self._finished(job, future))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'running': len(self._running),
+                'queued': sum(len(jobs) for jobs in self._queues.values()),
+                'sessions': len({job.session_id for job in self._running} | set(self._queues)),
+                'max_workers': self.max_workers,
+            }
+
+    def shutdown(self):
+        self._closing.set()
+        with self._lock:
+            for jobs in self._queues.values():
+                for job in jobs:
+                    job._updates.put(None)
+            self._queues.clear()
+            for job in self._running:
+                job._cancel.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
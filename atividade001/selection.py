@@ -0,0 +1,74 @@
+import numpy as np
+
+from core import NUM_CHARS, Snapshot, bernoulli_indices, encode
+
+
+def top_k(scores, k):
+    # O(n) partial sort; the k winners come back in no particular order
+    if k >= scores.size:
+        return np.arange(scores.size)
+    return np.argpartition(scores, scores.size - k)[scores.size - k:]
+
+
+def comma_selection(parents, parent_scores, offspring, offspring_scores, mu, rng, **options):
+    chosen = top_k(offspring_scores, mu)
+    return offspring[chosen], offspring_scores[chosen]
+
+
+def plus_selection(parents, parent_scores, offspring, offspring_scores, mu, rng, **options):
+    pool = np.concatenate((parents, offspring))
+    pool_scores = np.concatenate((parent_scores, offspring_scores))
+    chosen = top_k(pool_scores, mu)
+    return pool[chosen], pool_scores[chosen]
+
+
+def tournament_selection(parents, parent_scores, offspring, offspring_scores, mu, rng, tournament_size=3, **options):
+    entrants = rng.integers(0, offspring_scores.size, size=(mu, tournament_size))
+    winners = entrants[np.arange(mu), np.argmax(offspring_scores[entrants], axis=1)]
+    return offspring[winners], offspring_scores[winners]
+
+
+def truncation_selection(parents, parent_scores, offspring, offspring_scores, mu, rng, fraction=0.2, **options):
+    survivors = top_k(offspring_scores, max(1, int(np.ceil(fraction * offspring_scores.size))))
+    chosen = survivors[rng.integers(0, survivors.size, size=mu)]
+    return offspring[chosen], offspring_scores[chosen]
+
+
+SELECTIONS = {
+    'comma': comma_selection,
+    'plus': plus_selection,
+    'tournament': tournament_selection,
+    'truncation': truncation_selection,
+}
+
+
+def make_offspring(parents, lam, mutation_rate, rng):
+    # Parents take turns producing offspring, so each gets lam / mu of them
+    offspring = parents[np.arange(lam) % parents.shape[0]]
+    hits = bernoulli_indices(offspring.size, mutation_rate, rng)
+    offspring.reshape(-1)[hits] = rng.integers(0, NUM_CHARS, size=hits.size, dtype=np.uint8)
+    return offspring
+
+
+def selection_stream(target, strategy='comma', mu=1, lam=100, mutation_rate=0.05, seed=None, every=1,
+                     max_generations=None, include_candidate=True, **options):
+    if strategy not in SELECTIONS:
+        raise ValueError(f"unknown selection strategy: {strategy!r}")
+    select = SELECTIONS[strategy]
+    rng = np.random.default_rng(seed)
+    target_codes = encode(target) if isinstance(target, str) else target
+    every = max(int(every), 1)
+    parents = rng.integers(0, NUM_CHARS, size=(mu, target_codes.size), dtype=np.uint8)
+    scores = np.count_nonzero(parents == target_codes, axis=1)
+    generation = 0
+    while True:
+        best = int(np.argmax(scores))
+        done = scores[best] == target_codes.size or generation == max_generations
+        if done or generation % every == 0:
+            yield Snapshot(generation, int(scores[best]), parents[best].copy() if include_candidate else None)
+        if done:
+            return
+        generation += 1
+        offspring = make_offspring(parents, lam, mutation_rate, rng)
+        offspring_scores = np.count_nonzero(offspring == target_codes, axis=1)
+        parents, scores = select(parents, scores, offspring, offspring_scores, mu, rng, **options)
@@ -0,0 +1,116 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from core import GENERATION_MODES, evolve_until, validate_input
+
+FIELDS = [
+    'run', 'target', 'mutation_rate', 'population_size', 'repeat',
+    'generations', 'converged', 'final_score', 'seconds',
+]
+
+
+def build_grid(targets, mutation_rates, population_sizes, repeats, seed):
+    combos = list(itertools.product(targets, mutation_rates, population_sizes, range(repeats)))
+    # One child seed per grid point, so results do not depend on scheduling
+    seeds = np.random.SeedSequence(seed).spawn(len(combos))
+    return [
+        {
+            'run': index,
+            'target': target,
+            'mutation_rate': rate,
+            'population_size': size,
+            'repeat': repeat,
+            'seed': seeds[index],
+        }
+        for index, (target, rate, size, repeat) in enumerate(combos)
+    ]
+
+
+def run_task(task, max_generations, mode):
+    start = time.perf_counter()
+    trajectory = evolve_until(
+        task['target'],
+        task['mutation_rate'],
+        task['population_size'],
+        max_generations,
+        task['seed'],
+        mode=mode,
+    )
+    return {
+        'run': task['run'],
+        'target': task['target'],
+        'mutation_rate': task['mutation_rate'],
+        'population_size': task['population_size'],
+        'repeat': task['repeat'],
+        'generations': trajectory.generations,
+        'converged': trajectory.converged,
+        'final_score': int(trajectory.scores[-1]),
+        'seconds': round(time.perf_counter() - start, 6),
+    }
+
+
+class RowWriter:
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.writer = csv.DictWriter(stream, fieldnames=FIELDS)
+            self.writer.writeheader()
+
+    def write(self, row):
+        if self.fmt == 'csv':
+            self.writer.writerow(row)
+        else:
+            self.stream.write(json.dumps(row) + '\n')
+        self.stream.flush()
+
+
+def sweep(grid, writer, max_generations=100000, mode='dense', workers=None):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_task, task, max_generations, mode) for task in grid]
+        for future in as_completed(futures):
+            writer.write(future.result())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Weasel parameter sweep over mutation rate and population size")
+    parser.add_argument('--targets', nargs='+', default=['methinks it is like a weasel'])
+    parser.add_argument('--mutation-rates', nargs='+', type=float, default=[0.01, 0.02, 0.05, 0.1])
+    parser.add_argument('--population-sizes', nargs='+', type=int, default=[10, 50, 100, 500, 1000])
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--max-generations', type=int, default=100000)
+    parser.add_argument('--mode', choices=sorted(GENERATION_MODES), default='dense')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--output', default='-', help="CSV or JSON lines file ('-' for stdout)")
+    parser.add_argument('--format', choices=['csv', 'json'], default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    targets = [target.lower() for target in args.targets]
+    for target in targets:
+        if not validate_input(target):
+            sys.exit(f"invalid target phrase: {target!r}")
+    fmt = args.format or ('json' if args.output.endswith(('.json', '.jsonl')) else 'csv')
+    grid = build_grid(targets, args.mutation_rates, args.population_sizes, args.repeats, args.seed)
+
+    stream = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    try:
+        sweep(grid, RowWriter(stream, fmt), args.max_generations, args.mode, args.workers)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+
+if __name__ == "__main__":
+    main()
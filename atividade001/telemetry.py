@@ -0,0 +1,151 @@
+import sys
+
+import numpy as np
+
+
+class Telemetry:
+    def __init__(self, capacity=1 << 16, dtype=np.int32):
+        self._scores = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, size):
+        if size > self._scores.size:
+            grown = np.empty(max(size, 2 * self._scores.size), dtype=self._scores.dtype)
+            grown[:self._size] = self._scores[:self._size]
+            # Readers holding the old array keep a consistent prefix
+            self._scores = grown
+
+    def append(self, score):
+        if self._size == self._scores.size:
+            self._reserve(self._size + 1)
+        self._scores[self._size] = score
+        self._size += 1
+
+    def extend(self, scores):
+        scores = np.asarray(scores)
+        self._reserve(self._size + scores.size)
+        self._scores[self._size:self._size + scores.size] = scores
+        self._size += scores.size
+
+    def clear(self):
+        self._size = 0
+
+    @property
+    def scores(self):
+        size = self._size
+        return self._scores[:size]
+
+
+def lttb(x, y, threshold):
+    # Largest-Triangle-Three-Buckets (Steinarsson, 2013)
+    size = y.size
+    if threshold >= size or threshold < 3:
+        return x, y
+    values = y.astype(np.float64)
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = size - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = edges[bucket + 1], edges[bucket + 2] if bucket + 2 < edges.size else size
+        avg_x = x[next_start:next_end].mean()
+        avg_y = values[next_start:next_end].mean()
+        area = np.abs(
+            (x[previous] - avg_x) * (values[start:end] - values[previous])
+            - (x[previous] - x[start:end]) * (avg_y - values[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return x[selected], y[selected]
+
+
+class ChartWindow:
+    def __init__(self, points=300, tail_points=100):
+        self.head_spans = (points - tail_points) // 2
+        self.tail_buckets = tail_points // 2
+        self.width = 1
+        # Generation of the min and the max of every folded span
+        self._spans = np.empty((0, 2), dtype=np.int64)
+        self._folded = 0
+
+    def _merge(self, scores):
+        # Neighbouring spans merge and the width doubles, so old history keeps its share of points;
+        # an odd span out goes back to the raw tail
+        pairs = self._spans[:len(self._spans) // 2 * 2].reshape(-1, 2, 2)
+        lows, highs = pairs[:, :, 0], pairs[:, :, 1]
+        low = np.take_along_axis(lows, scores[lows].argmin(axis=1)[:, None], axis=1)
+        high = np.take_along_axis(highs, scores[highs].argmax(axis=1)[:, None], axis=1)
+        self._spans = np.concatenate((low, high), axis=1)
+        self.width *= 2
+        self._folded = len(self._spans) * self.width
+
+    def update(self, scores):
+        # Min and max of each span of `width` generations, plus a bucketed raw tail:
+        # never more than `points` in total, and each refresh only reads the generations since the last fold
+        spans = (scores.size - self._folded) // self.width
+        if spans:
+            end = self._folded + spans * self.width
+            block = scores[self._folded:end].reshape(spans, self.width)
+            starts = self._folded + np.arange(spans)[:, None] * self.width
+            self._spans = np.concatenate(
+                (self._spans, starts + np.stack((block.argmin(axis=1), block.argmax(axis=1)), axis=1))
+            )
+            self._folded = end
+            while len(self._spans) > self.head_spans:
+                self._merge(scores)
+        if scores.size <= 2 * (self.head_spans + self.tail_buckets):
+            return np.arange(scores.size), scores
+        tail = np.arange(self._folded, scores.size)
+        if tail.size > 2 * self.tail_buckets:
+            edges = np.linspace(0, tail.size, self.tail_buckets + 1).astype(np.int64)
+            tail = np.concatenate([
+                tail[start:end][[scores[tail[start:end]].argmin(), scores[tail[start:end]].argmax()]]
+                for start, end in zip(edges[:-1], edges[1:])
+            ])
+        x = np.unique(np.concatenate((self._spans.ravel(), tail)))
+        return x, scores[x]
+
+
+def shape_error(x, y, scores):
+    # Worst vertical gap between the drawn line and the full history, as a fraction of its range
+    line = np.interp(np.arange(scores.size), x, y)
+    return float(np.abs(line - scores).max() / max(int(scores.max()) - int(scores.min()), 1))
+
+
+def check_against_lttb(scores, points=300, tail_points=100, refresh=400, ratio=4.0, slack=0.01):
+    # Feed the window the way the app does and compare its line with LTTB over the whole history
+    window = ChartWindow(points, tail_points)
+    for end in range(refresh, scores.size + refresh, refresh):
+        x, y = window.update(scores[:end])
+        assert x.size <= points, f"window holds {x.size} points, more than {points}"
+    error = shape_error(x, y, scores)
+    reference = shape_error(*lttb(np.arange(scores.size), scores, points), scores)
+    assert error <= ratio * reference + slack, (
+        f"{scores.size} generations: window is off by {error:.1%} of the range, LTTB by {reference:.1%}"
+    )
+    return error, reference
+
+
+# (length, mutation rate, generation cap) of runs whose curves the window has to follow
+WINDOW_CASES = [(28, 0.05, 100000), (300, 0.01, 100000), (1000, 0.001, 12000), (10000, 0.0001, 100000)]
+
+
+if __name__ == "__main__":
+    from core import weasel_stream
+
+    failures = 0
+    for length, rate, cap in WINDOW_CASES:
+        target = ''.join(np.random.default_rng(length).choice(list('abcdefghijklmnopqrstuvwxyz '), size=length))
+        stream = weasel_stream(target, rate, 100, 0, max_generations=cap, include_candidate=False, mode='sparse')
+        scores = np.array([snapshot.score for snapshot in stream], dtype=np.int32)
+        try:
+            print(length, rate, scores.size, check_against_lttb(scores))
+        except AssertionError as error:
+            print(f"FAIL {error}", file=sys.stderr)
+            failures += 1
+    sys.exit(1 if failures else 0)
@@ -15,6 +15,14 @@ Começando com uma frase aleatória, o programa gera cópias com uma pequena cha
         'mutation_rate_help': "A probabilidade de cada caractere sofrer mutação. Taxas mais altas podem acelerar a convergência, mas também podem ser instáveis.",
         'population_size_label': "Tamanho da População",
         'population_size_help': "O número de 'descendentes' gerados em cada geração. Populações maiores exploram mais possibilidades.",
+        'seed_label': "Semente",
+        'seed_help': "Semente do gerador aleatório. Com semente diferente de 0 a execução é reprodutível e fica em cache para ser reapresentada instantaneamente.",
+        'profiling_label': "Painel de desempenho",
+        'profiling_help': "Mostra o tempo gasto em cada fase do laço de atualização da interface.",
+        'profiling_header': "⏱️ Desempenho",
+        'generations_per_second': "Gerações/s",
+        'render_share': "Tempo renderizando",
+        'profiling_export': "Exportar medições (CSV)",
         'start_button': "▶️ Iniciar Simulação",
         'stop_button': "⏹️ Parar Simulação",
         'empty_target_error': "A frase alvo não pode estar vazia.",
@@ -23,11 +31,22 @@ Começando com uma frase aleatória, o programa gera cópias com uma pequena cha
         'generation_metric': "Geração",
         'score_metric': "Pontuação",
         'accuracy_metric': "Precisão",
+        'prediction_metric': "Gerações Esperadas",
+        'prediction_value': "{expected:.0f} ± {std:.0f}",
+        'prediction_unreachable': "> {limit:,.0f}",
+        'prediction_unreachable_help': "Com estes parâmetros as mutações desfazem os acertos mais rápido do que a seleção os acumula; na prática a simulação não chega ao alvo.",
+        'prediction_help': "Previsão exata pela cadeia de Markov sobre o número de acertos. 80% das execuções terminam entre as gerações {low} e {high}.",
         'progress_bar_text': "Progresso: {accuracy:.2f}%",
         'history_header': "📜 Histórico da Evolução",
         'history_entry': "Geração {generation}: {candidate}",
         'success_message': "🎉 Sucesso! A frase alvo foi alcançada na geração {generation}.",
         'stop_message': "Simulação parada pelo usuário.",
+        'job_error': "A simulação falhou no servidor: {error}",
+        'limit_message': "Simulação encerrada ao atingir o limite de {limit:,} gerações.",
+        'export_button': "Exportar trajetória",
+        'export_help': "Baixa geração, pontuação, precisão, mutações e tempo de cada geração (Parquet, ou .npz sem pyarrow).",
+        'queued_message': "Aguardando um processo livre no servidor...",
+        'quota_error': "Você já tem {quota} simulações em andamento. Pare uma antes de iniciar outra.",
         'info_message': "Ajuste os parâmetros na barra lateral e clique em 'Iniciar Simulação' para começar.",
         'language_select': "Idioma / Language"
     },
@@ -46,6 +65,14 @@ Starting with a random phrase, the program generates copies with a small chance
         'mutation_rate_help': "The probability of each character mutating. Higher rates can speed up convergence but may also be unstable.",
         'population_size_label': "Population Size",
         'population_size_help': "The number of 'offspring' generated in each generation. Larger populations explore more possibilities.",
+        'seed_label': "Seed",
+        'seed_help': "Random generator seed. With a non-zero seed the run is reproducible and cached so it can be replayed instantly.",
+        'profiling_label': "Profiling panel",
+        'profiling_help': "Shows the time spent in each phase of the UI refresh loop.",
+        'profiling_header': "⏱️ Profiling",
+        'generations_per_second': "Generations/s",
+        'render_share': "Render share",
+        'profiling_export': "Export timing trace (CSV)",
         'start_button': "▶️ Start Simulation",
         'stop_button': "⏹️ Stop Simulation",
         'empty_target_error': "The target phrase cannot be empty.",
@@ -54,11 +81,22 @@ Starting with a random phrase, the program generates copies with a small chance
         'generation_metric': "Generation",
         'score_metric': "Score",
         'accuracy_metric': "Accuracy",
+        'prediction_metric': "Expected Generations",
+        'prediction_value': "{expected:.0f} ± {std:.0f}",
+        'prediction_unreachable': "> {limit:,.0f}",
+        'prediction_unreachable_help': "With these settings mutation undoes matches faster than selection keeps them; in practice the run will not reach the target.",
+        'prediction_help': "Exact prediction from the Markov chain over the number of matches. 80% of runs finish between generations {low} and {high}.",
         'progress_bar_text': "Progress: {accuracy:.2f}%",
         'history_header': "📜 Evolution History",
         'history_entry': "Generation {generation}: {candidate}",
         'success_message': "🎉 Success! The target phrase was reached in generation {generation}.",
         'stop_message': "Simulation stopped by user.",
+        'job_error': "The simulation failed on the server: {error}",
+        'limit_message': "Simulation ended after reaching the {limit:,} generation limit.",
+        'export_button': "Export trajectory",
+        'export_help': "Downloads generation, score, accuracy, mutations and wall time for every generation (Parquet, or .npz without pyarrow).",
+        'queued_message': "Waiting for a free server process...",
+        'quota_error': "You already have {quota} simulations running. Stop one before starting another.",
         'info_message': "Adjust the parameters in the sidebar and click 'Start Simulation' to begin.",
         'language_select': "Language / Idioma"
     }
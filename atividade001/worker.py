@@ -0,0 +1,40 @@
+from dataclasses import dataclass
+
+from telemetry import Telemetry
+
+
+@dataclass
+class WorkerSnapshot:
+    generation: int
+    score: int
+    candidate: str
+    elapsed: float
+    done: bool
+
+
+class ReplayWorker:
+    error = None
+
+    def __init__(self, trajectory):
+        self.target = trajectory.target
+        self.telemetry = Telemetry(capacity=max(trajectory.scores.size, 1))
+        self.telemetry.extend(trajectory.scores)
+        self.checkpoints = trajectory.checkpoints
+        self._trajectory = trajectory
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    @property
+    def converged(self):
+        return self._trajectory.converged
+
+    def trajectory(self):
+        return self._trajectory
+
+    def snapshot(self):
+        trajectory = self._trajectory
+        return WorkerSnapshot(trajectory.generations, int(trajectory.scores[-1]), trajectory.best, 0.0, True)